@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Benchmark the slide builders, notes creation and save on synthetic decks.
+
+    uv run bench_slides.py --json bench.json
+    uv run bench_slides.py --sizes 10 1000 --compare bench.json
+
+Timings for each deck size are stored as JSON; with --compare, any timing
+that got slower than the baseline by more than --threshold is reported and
+the script exits non-zero.
+"""
+
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+
+import pptx
+
+import slides
+
+LONG_NOTES = (
+    "These notes are deliberately long, the way speaker notes for a real talk "
+    "are: a full paragraph of what to say, a reminder of the story so far and "
+    "the punchline to land before moving on. "
+) * 8
+
+# One in ten slides is something other than a content slide, like a real deck.
+KIND_CYCLE = ["title"] + ["content"] * 7 + ["section", "end"]
+
+
+def synthetic_slides(n, bullets=8):
+    specs = []
+    for i in range(n):
+        kind = KIND_CYCLE[i % len(KIND_CYCLE)]
+        spec = dict(builder=kind, title=f"Slide {i + 1}: a reasonably long title")
+        lines = [
+            f"Bullet {j + 1} on slide {i + 1} with enough words to wrap"
+            for j in range(bullets)
+        ]
+        if kind == "title":
+            spec["subtitle"] = "A subtitle\n\nwith a couple of lines"
+        elif kind == "content":
+            spec["bullets"] = lines
+        elif kind == "section":
+            spec["subtitle"] = "What comes next"
+        else:
+            spec["lines"] = lines
+        spec["notes"] = LONG_NOTES
+        specs.append(spec)
+    return specs
+
+
+def bench_deck(n):
+    """Time builders, notes and save for an `n`-slide deck, each on its own."""
+    builders = {}
+
+    slide_notes = []
+
+    start = time.perf_counter()
+    prs = slides.new_presentation()
+    for spec in synthetic_slides(n):
+        kwargs = dict(spec)
+        kind = kwargs.pop("builder")
+        notes = kwargs.pop("notes")
+
+        t0 = time.perf_counter()
+        slide = slides.BUILDERS[kind](prs, **kwargs)
+        t1 = time.perf_counter()
+
+        calls, seconds = builders.get(kind, (0, 0.0))
+        builders[kind] = (calls + 1, seconds + t1 - t0)
+        slide_notes.append((slide, notes))
+
+    t0 = time.perf_counter()
+    slides.add_notes(prs, slide_notes)
+    notes_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    slides.save(prs, io.BytesIO())
+    save_seconds = time.perf_counter() - t0
+    total = time.perf_counter() - start
+
+    # python-pptx's own save, for reference; not part of the total.
+    t0 = time.perf_counter()
+    prs.save(io.BytesIO())
+    pptx_save_seconds = time.perf_counter() - t0
+
+    return {
+        "slides": n,
+        "builders": {
+            kind: {"calls": calls, "seconds": seconds, "ms_per_call": seconds / calls * 1000}
+            for kind, (calls, seconds) in sorted(builders.items())
+        },
+        "notes": notes_seconds,
+        "save": save_seconds,
+        "save_python_pptx": pptx_save_seconds,
+        "total": total,
+        "ms_per_slide": total / n * 1000,
+    }
+
+
+# Timings shorter than this are mostly noise and never reported.
+NOISE_FLOOR = 0.01
+
+
+def _timings(result):
+    """Flatten one deck result into name -> seconds."""
+    flat = {"notes": result["notes"], "save": result["save"], "total": result["total"]}
+    if "save_python_pptx" in result:
+        flat["save_python_pptx"] = result["save_python_pptx"]
+    for kind, builder in result["builders"].items():
+        flat[f"builder.{kind}"] = builder["seconds"]
+    return flat
+
+
+def compare(results, baseline, threshold):
+    """Print a line per timing that regressed by more than `threshold`."""
+    regressions = 0
+    for size, result in results.items():
+        if size not in baseline:
+            continue
+        old = _timings(baseline[size])
+        for name, new_value in _timings(result).items():
+            old_value = old.get(name)
+            if old_value is None or old_value < NOISE_FLOOR:
+                continue
+            ratio = new_value / old_value
+            if ratio > threshold:
+                regressions += 1
+                print(
+                    f"REGRESSION {size} slides {name}: "
+                    f"{old_value:.4f} -> {new_value:.4f} ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--json", metavar="PATH", help="write results to this file")
+    parser.add_argument("--compare", metavar="PATH", help="baseline results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="slowdown ratio reported as a regression (default: 1.2)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    previous = None
+    for n in args.sizes:
+        result = bench_deck(n)
+        results[str(n)] = result
+        growth = ""
+        if previous:
+            ratio = result["ms_per_slide"] / previous["ms_per_slide"]
+            growth = f", {ratio:.2f}x per slide vs {previous['slides']}"
+        print(
+            f"{n:>6} slides: total {result['total']:.2f}s, notes {result['notes']:.2f}s, "
+            f"save {result['save']:.2f}s (python-pptx {result['save_python_pptx']:.2f}s), "
+            f"{result['ms_per_slide']:.2f} ms/slide{growth}"
+        )
+        for kind, builder in result["builders"].items():
+            print(
+                f"        {kind:<8} {builder['calls']:>6} calls, "
+                f"{builder['ms_per_call']:.3f} ms/call"
+            )
+        previous = result
+
+    report = {
+        "python": platform.python_version(),
+        "python_pptx": pptx.__version__,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Render the CV with RenderCV, reusing earlier outputs whose inputs are unchanged.
+
+    uv run cv_cache.py Gijs_Molenaar_CV.yaml
+
+Outputs come in two groups with their own inputs: the Typst file, PDF and
+PNGs depend on the CV, its design and locale and any local theme templates;
+the Markdown and HTML don't depend on the design. Each group is keyed on a
+hash of its inputs and the rendercv version, and stored under .cv_cache/.
+On a hit its files are copied back into rendercv_output/; on a miss only the
+missing group is rendered, by passing rendercv the --dont-generate-* flags
+for the other.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from importlib.metadata import PackageNotFoundError, version
+
+CACHE_DIR = ".cv_cache"
+OUTPUT_DIR = "rendercv_output"
+
+# Top-level YAML sections each group is rendered from, the local template
+# directories RenderCV would pick up instead of its own, and the rendercv
+# flags that skip the group. Sections not listed feed both groups.
+GROUPS = {
+    "typst": {
+        "sections": ("cv", "design", "locale", "rendercv_settings"),
+        "templates": ("{theme}",),
+        "skip": ("--dont-generate-pdf", "--dont-generate-png"),
+    },
+    "markdown": {
+        "sections": ("cv", "locale", "rendercv_settings"),
+        "templates": ("markdown",),
+        "skip": ("--dont-generate-markdown",),
+    },
+}
+MARKDOWN_SUFFIXES = (".md", ".html")
+
+# Cache entries kept per group; older ones are removed after each render.
+KEEP = 5
+
+SECTION = re.compile(r"^([A-Za-z_][\w-]*):", re.MULTILINE)
+THEME = re.compile(r"^design:.*?^\s+theme:\s*['\"]?([\w-]+)", re.MULTILINE | re.DOTALL)
+
+
+def split_sections(text):
+    """Split YAML text into its top-level sections, keyed by name.
+
+    Anything before the first key (comments, a schema line) is keyed "".
+    """
+    starts = [(m.start(), m.group(1)) for m in SECTION.finditer(text)]
+    sections = {"": text[: starts[0][0]] if starts else text}
+    for (start, name), (end, _) in zip(starts, starts[1:] + [(len(text), None)]):
+        sections[name] = text[start:end]
+    return sections
+
+
+def _hash_tree(digest, path):
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode())
+            with open(file_path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+
+
+def group_keys(yaml_path):
+    """Cache key of every output group for the CV at `yaml_path`."""
+    with open(yaml_path, encoding="utf-8") as f:
+        text = f.read()
+    sections = split_sections(text)
+    match = THEME.search(text)
+    theme = match.group(1) if match else "classic"
+    try:
+        rendercv_version = version("rendercv")
+    except PackageNotFoundError:
+        sys.exit("rendercv is not installed; run this with `uv run`")
+
+    base = os.path.dirname(os.path.abspath(yaml_path))
+    keys = {}
+    for group, spec in GROUPS.items():
+        digest = hashlib.sha256(f"rendercv {rendercv_version}\n".encode())
+        for name in sorted(sections):
+            if name in spec["sections"] or not any(
+                name in other["sections"] for other in GROUPS.values()
+            ):
+                digest.update(sections[name].encode())
+        for template in spec["templates"]:
+            directory = os.path.join(base, template.format(theme=theme))
+            if os.path.isdir(directory):
+                _hash_tree(digest, directory)
+        keys[group] = digest.hexdigest()[:16]
+    return keys
+
+
+def _group_of(filename):
+    return "markdown" if filename.endswith(MARKDOWN_SUFFIXES) else "typst"
+
+
+def _entry(group, key):
+    return os.path.join(CACHE_DIR, f"{group}-{key}")
+
+
+def restore(group, key):
+    """Copy a cached group into OUTPUT_DIR, replacing that group's old files."""
+    entry = _entry(group, key)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    for name in os.listdir(OUTPUT_DIR):
+        if _group_of(name) == group:
+            os.remove(os.path.join(OUTPUT_DIR, name))
+    for name in os.listdir(entry):
+        shutil.copy2(os.path.join(entry, name), os.path.join(OUTPUT_DIR, name))
+
+
+def store(group, key):
+    """Copy the group's files from OUTPUT_DIR into the cache and prune old entries."""
+    entry = _entry(group, key)
+    partial = entry + ".partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+    for name in os.listdir(OUTPUT_DIR):
+        path = os.path.join(OUTPUT_DIR, name)
+        if os.path.isfile(path) and _group_of(name) == group:
+            shutil.copy2(path, os.path.join(partial, name))
+    shutil.rmtree(entry, ignore_errors=True)
+    os.rename(partial, entry)
+
+    entries = sorted(
+        (e for e in os.scandir(CACHE_DIR) if e.name.startswith(group + "-")),
+        key=lambda e: e.stat().st_mtime,
+        reverse=True,
+    )
+    for old in entries[KEEP:]:
+        shutil.rmtree(old.path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="RenderCV YAML file")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and re-render")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    keys = group_keys(args.input)
+    cached = {
+        group
+        for group, key in keys.items()
+        if not args.force and os.path.isdir(_entry(group, key))
+    }
+    for group in cached:
+        restore(group, keys[group])
+
+    missing = [group for group in GROUPS if group not in cached]
+    if missing:
+        flags = [flag for group in cached for flag in GROUPS[group]["skip"]]
+        command = [sys.executable, "-m", "rendercv", "render", args.input, *flags]
+        result = subprocess.run(command)
+        if result.returncode:
+            sys.exit(result.returncode)
+        for group in missing:
+            store(group, keys[group])
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{OUTPUT_DIR}/: cached {', '.join(sorted(cached)) or 'nothing'}; "
+        f"rendered {', '.join(missing) or 'nothing'} in {elapsed * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
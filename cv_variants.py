@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Render tailored variants of the CV, selected by tags, in parallel.
+
+    uv run cv_variants.py Gijs_Molenaar_CV.yaml cv_variants.yaml [ml short ...]
+
+Entries in the CV may carry ``tags: ml, infra`` and ``highlight_tags``, the
+tags of each highlight separated by ``|`` (``" | ml | infra"`` tags the
+second and third of three). Both are strings because RenderCV 2.6 hands
+every extra entry key to its templates as text, where a list breaks a plain
+``rendercv render``; variants drop both before rendering. Each variant in
+the variants file says what to keep:
+
+    ml:
+      tags: [ml]                         # untagged items, and items with any of these
+      sections: [summary, experience]    # only these sections, in this order
+      max_highlights: 2                  # per entry, after filtering by tag
+
+The CV is read and validated once. Each variant's model is derived from the
+validated one in memory and rendered to Typst, PDF, PNG, Markdown and HTML
+in a process pool, into rendercv_output/<variant>/, so twenty variants share
+one validation and one rendercv import per worker instead of twenty runs.
+Written against the rendercv 2.6 API (rendercv.schema, rendercv.renderer),
+which needs Python 3.12 or later.
+"""
+
+import argparse
+import os
+import pathlib
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rendercv.exception import RenderCVUserValidationError
+from rendercv.renderer.html import generate_html
+from rendercv.renderer.markdown import generate_markdown
+from rendercv.renderer.pdf_png import generate_pdf, generate_png
+from rendercv.renderer.typst import generate_typst
+from rendercv.schema.rendercv_model_builder import build_rendercv_dictionary_and_model
+from rendercv.schema.yaml_reader import read_yaml
+
+OUTPUT_DIR = "rendercv_output"
+VARIANT_FIELDS = {"tags", "sections", "max_highlights"}
+TAG_KEYS = ("tags", "highlight_tags")
+TAG_SEPARATOR = re.compile(r"[,\s]+")
+
+# Where each output goes in a variant's directory, by render_command setting.
+OUTPUT_PATHS = ("typst_path", "pdf_path", "png_path", "markdown_path", "html_path")
+
+# The validated CV, set in the parent and inherited by forked workers, or
+# validated once per worker by _init_worker() where workers are spawned.
+_base = None
+
+
+def validate(path):
+    """Validate the CV at `path` the way ``rendercv render`` would."""
+    return build_rendercv_dictionary_and_model(pathlib.Path(path).resolve())[1]
+
+
+def _tags(value):
+    # A tag list, or a string of tags separated by commas or spaces.
+    if isinstance(value, str):
+        return [tag for tag in TAG_SEPARATOR.split(value) if tag]
+    return list(value or [])
+
+
+def _extra(entry, key):
+    extra = getattr(entry, "model_extra", None) or {}
+    value = extra.get(key)
+    if key != "highlight_tags":
+        return _tags(value)
+    if isinstance(value, str):
+        value = value.split("|")
+    return [_tags(tags) for tags in value or []]
+
+
+def _selected(tags, wanted):
+    return not tags or not wanted or bool(set(tags) & set(wanted))
+
+
+def check_variants(model, variants):
+    """Problems with the variants file or the tags in the CV, as strings."""
+    errors = []
+    sections = model.cv.sections or {}
+    for name, variant in variants.items():
+        if not isinstance(variant, dict):
+            errors.append(f"{name}: expected a mapping")
+            continue
+        for field in sorted(set(variant) - VARIANT_FIELDS):
+            errors.append(f"{name}: unknown field {field!r}")
+        for title in variant.get("sections") or []:
+            if title not in sections:
+                errors.append(f"{name}: no section {title!r} in the CV")
+    for title, entries in sections.items():
+        for index, entry in enumerate(entries):
+            highlight_tags = _extra(entry, "highlight_tags")
+            highlights = getattr(entry, "highlights", None) or []
+            if highlight_tags and len(highlight_tags) != len(highlights):
+                errors.append(
+                    f"{title} #{index + 1}: {len(highlight_tags)} highlight_tags "
+                    f"for {len(highlights)} highlights"
+                )
+    return errors
+
+
+def derive(model, variant, output):
+    """The CV model `variant` selects, rendering into `output`.
+
+    Everything else is shared with `model`.
+    """
+    wanted = _tags(variant.get("tags"))
+    limit = variant.get("max_highlights")
+    sections_input = model.cv.sections or {}
+    titles = variant.get("sections") or list(sections_input)
+
+    sections = {}
+    for title in titles:
+        kept = []
+        for entry in sections_input[title]:
+            if isinstance(entry, str):  # a text entry
+                kept.append(entry)
+                continue
+            if not _selected(_extra(entry, "tags"), wanted):
+                continue
+            update = {}
+            highlights = getattr(entry, "highlights", None)
+            if highlights:
+                highlight_tags = _extra(entry, "highlight_tags") or [[]] * len(highlights)
+                highlights = [
+                    text
+                    for text, tags in zip(highlights, highlight_tags)
+                    if _selected(tags, wanted)
+                ][:limit]
+                update["highlights"] = highlights or None
+            entry = entry.model_copy(update=update)
+            extra = entry.model_extra or {}
+            entry.__pydantic_extra__ = {
+                key: value for key, value in extra.items() if key not in TAG_KEYS
+            }
+            kept.append(entry)
+        if kept:
+            sections[title] = kept
+
+    cv = model.cv.model_copy(update={"sections": sections})
+    vars(cv).pop("rendercv_sections", None)  # cached from the full CV, if computed
+    render_command = model.settings.render_command
+    render_command = render_command.model_copy(
+        update={
+            key: pathlib.Path(output, getattr(render_command, key).name) for key in OUTPUT_PATHS
+        }
+    )
+    settings = model.settings.model_copy(update={"render_command": render_command})
+    return model.model_copy(update={"cv": cv, "settings": settings})
+
+
+def _init_worker(path):
+    global _base
+    if _base is None:
+        _base = validate(path)
+
+
+def _render_variant(name, variant, output_dir):
+    # Runs in a worker process; any exception is reported for this variant only.
+    start = time.perf_counter()
+    model = derive(_base, variant, pathlib.Path(output_dir, name))
+    typst = generate_typst(model)
+    generate_pdf(model, typst)
+    generate_png(model, typst)
+    generate_html(model, generate_markdown(model))
+    return time.perf_counter() - start
+
+
+def main():
+    global _base
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="RenderCV YAML file")
+    parser.add_argument("variants", help="YAML file defining the variants")
+    parser.add_argument("names", nargs="*", help="variants to render (default: all)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    output_dir = os.path.abspath(args.output_dir)
+    variants = read_yaml(pathlib.Path(args.variants))
+    unknown = [name for name in args.names if name not in variants]
+    if unknown:
+        sys.exit(f"unknown variants: {', '.join(unknown)}")
+    variants = {name: variants[name] for name in args.names or variants}
+
+    try:
+        _base = validate(args.input)
+    except RenderCVUserValidationError as exc:
+        problems = "\n".join(
+            f"  {'.'.join(map(str, error.location))}: {error.message}"
+            for error in exc.validation_errors
+        )
+        sys.exit(f"{args.input}: invalid CV\n{problems}")
+    except OSError as exc:
+        sys.exit(f"{args.input}: {exc}")
+    errors = check_variants(_base, variants)
+    for error in errors:
+        print(f"{args.variants}: {error}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+    failed = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(args.input,)
+    ) as pool:
+        futures = {
+            pool.submit(_render_variant, name, variant, output_dir): name
+            for name, variant in variants.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                elapsed = future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"FAILED {name}: {type(exc).__name__}: {exc}", file=sys.stderr)
+                continue
+            print(f"Rendered {name} in {elapsed:.2f}s")
+
+    wall = time.perf_counter() - start
+    print(f"Rendered {len(variants) - failed}/{len(variants)} variants in {wall:.2f}s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Full-text search over the titles, bullets and notes of a library of decks.
+
+    uv run deck_index.py index decks/ talks/*.json
+    uv run deck_index.py search "square kilometre array"
+
+``index`` reads .pptx files, and JSON files holding a list of slide specs, from
+the paths given (directories are searched) into an SQLite FTS5 table in
+.deck_index.db. A deck whose size and mtime are unchanged is skipped; one
+whose content hash is unchanged is only touched up. Decks that are gone are
+dropped. ``search`` takes an FTS5 query, or plain words, and prints the best
+slides with a snippet, titles weighing most and notes least.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+
+from lxml import etree
+
+import opc
+
+DB = ".deck_index.db"
+
+# An indexed slide's rowid is its deck's id shifted left by SLIDE_BITS plus
+# its index, so a deck's rows can be dropped by rowid range.
+SLIDE_BITS = 20
+
+# bm25() weights of the title, body and notes columns.
+WEIGHTS = (10.0, 2.0, 1.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS slides USING fts5(
+    title, body, notes, tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+
+def connect(path=DB):
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def pptx_slides(blob):
+    """``(title, body, notes)`` for every slide of the .pptx file in `blob`."""
+    slides = []
+    with zipfile.ZipFile(io.BytesIO(blob)) as zf:
+        for partname in opc.slide_partnames(zf):
+            bodies = [
+                opc.box_text(txBody)
+                for txBody in opc.text_bodies(etree.fromstring(zf.read(partname)))
+                if txBody is not None
+            ]
+            notes = ""
+            for reltype, target in opc.part_rels(zf, partname).values():
+                if reltype == opc.RT_NOTES_SLIDE:
+                    txBody = opc.notes_body(etree.fromstring(zf.read(target)))
+                    notes = opc.box_text(txBody) if txBody is not None else ""
+            slides.append((bodies[0] if bodies else "", "\n".join(bodies[1:]), notes))
+    return slides
+
+
+def spec_slides(specs):
+    """``(title, body, notes)`` for every slide spec in a deck definition.
+
+    Raises ValueError for a spec whose text isn't strings.
+    """
+    slides = []
+    for number, spec in enumerate(specs, 1):
+        title = spec.get("title", "")
+        body = spec.get("bullets") or spec.get("lines") or [spec.get("subtitle") or ""]
+        notes = spec.get("notes", "")
+        if not isinstance(body, list) or not all(
+            isinstance(text, str) for text in (title, notes, *body)
+        ):
+            raise ValueError(f"slide {number}: text that isn't a string")
+        slides.append((title, "\n".join(body), notes))
+    return slides
+
+
+def read_deck(path, blob):
+    """The slides of the deck in `blob`, read from `path`, or None if it isn't one."""
+    if path.endswith(".pptx"):
+        return pptx_slides(blob)
+    try:
+        specs = json.loads(blob)
+    except ValueError:
+        return None
+    if isinstance(specs, list) and all(isinstance(s, dict) and "builder" in s for s in specs):
+        return spec_slides(specs)
+    return None  # notes files, manifests and other JSON
+
+
+def find_decks(paths):
+    """Every .pptx and .json file given or under a directory given, as absolute paths."""
+    found = []
+    for path in paths:
+        if not os.path.isdir(path):
+            found.append(os.path.abspath(path))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if name.endswith((".pptx", ".json")) and not name.startswith("~$"):
+                    found.append(os.path.abspath(os.path.join(root, name)))
+    return found
+
+
+def index(db, paths):
+    """Bring the index up to date with the decks at `paths`.
+
+    Returns counts of ``indexed``, ``unchanged`` and ``removed`` decks, and
+    the ``slides`` indexed.
+    """
+    counts = dict(indexed=0, unchanged=0, removed=0, slides=0)
+    known = {
+        path: (deck_id, size, mtime_ns, sha256)
+        for deck_id, path, size, mtime_ns, sha256 in db.execute(
+            "SELECT id, path, size, mtime_ns, sha256 FROM decks"
+        )
+    }
+    seen = set()
+    with db:
+        for path in find_decks(paths):
+            seen.add(path)
+            try:
+                stat = os.stat(path)
+                if path in known and known[path][1:3] == (stat.st_size, stat.st_mtime_ns):
+                    counts["unchanged"] += 1
+                    continue
+                with open(path, "rb") as f:
+                    blob = f.read()
+            except OSError as exc:
+                print(f"{path}: {exc}", file=sys.stderr)
+                continue
+            sha256 = hashlib.sha256(blob).hexdigest()
+            if path in known and known[path][3] == sha256:
+                db.execute(
+                    "UPDATE decks SET size = ?, mtime_ns = ? WHERE id = ?",
+                    (stat.st_size, stat.st_mtime_ns, known[path][0]),
+                )
+                counts["unchanged"] += 1
+                continue
+            try:
+                slides = read_deck(path, blob)
+            except (
+                KeyError,
+                ValueError,
+                zipfile.BadZipFile,
+                etree.XMLSyntaxError,
+                ET.ParseError,
+            ) as exc:
+                print(f"{path}: not a readable deck: {exc}", file=sys.stderr)
+                continue
+            if path in known:
+                _drop(db, known[path][0])
+                counts["removed"] += slides is None
+            if slides is None:
+                continue
+            deck_id = db.execute(
+                "INSERT INTO decks (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, sha256),
+            ).lastrowid
+            db.executemany(
+                "INSERT INTO slides (rowid, title, body, notes) VALUES (?, ?, ?, ?)",
+                [((deck_id << SLIDE_BITS) + i, *slide) for i, slide in enumerate(slides)],
+            )
+            counts["indexed"] += 1
+            counts["slides"] += len(slides)
+
+        roots = [os.path.abspath(path) for path in paths]
+        for path, (deck_id, *_) in known.items():
+            under = any(path == root or path.startswith(root + os.sep) for root in roots)
+            if path not in seen and (under or not os.path.exists(path)):
+                _drop(db, deck_id)
+                counts["removed"] += 1
+    return counts
+
+
+def _drop(db, deck_id):
+    db.execute(
+        "DELETE FROM slides WHERE rowid >= ? AND rowid < ?",
+        (deck_id << SLIDE_BITS, (deck_id + 1) << SLIDE_BITS),
+    )
+    db.execute("DELETE FROM decks WHERE id = ?", (deck_id,))
+
+
+def search(db, query, limit=10):
+    """``(deck path, slide number, title, snippet)`` of the best matches for `query`.
+
+    `query` is FTS5 syntax; if it doesn't parse, its words are searched for
+    as they are.
+    """
+    sql = f"""
+        SELECT decks.path, (slides.rowid & {(1 << SLIDE_BITS) - 1}) + 1, slides.title,
+               snippet(slides, -1, '[', ']', '...', 12)
+        FROM slides JOIN decks ON decks.id = slides.rowid >> {SLIDE_BITS}
+        WHERE slides MATCH ? ORDER BY bm25(slides, ?, ?, ?) LIMIT ?
+    """
+    try:
+        return db.execute(sql, (query, *WEIGHTS, limit)).fetchall()
+    except sqlite3.OperationalError:
+        words = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+        return db.execute(sql, (words, *WEIGHTS, limit)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=DB, help=f"index database (default: {DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    index_parser = commands.add_parser("index", help="add new and changed decks to the index")
+    index_parser.add_argument("paths", nargs="+", help="decks, or directories to search for them")
+    search_parser = commands.add_parser("search", help="find slides matching a query")
+    search_parser.add_argument("query", nargs="+")
+    search_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    db = connect(args.db)
+    if args.command == "index":
+        counts = index(db, args.paths)
+        print(
+            f"Indexed {counts['indexed']} decks ({counts['slides']} slides), "
+            f"{counts['unchanged']} unchanged, {counts['removed']} removed "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        return
+
+    results = search(db, " ".join(args.query), args.limit)
+    for path, slide, title, snippet in results:
+        snippet = " ".join(snippet.split())
+        print(f"{os.path.relpath(path)}:{slide}: {title}\n    {snippet}")
+    print(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,197 +1,33 @@
 #!/usr/bin/env python3
 """Generate PyCon Namibia talk slides as .pptx"""
 
-from pptx import Presentation
-from pptx.util import Inches, Pt, Emu
-from pptx.enum.text import PP_ALIGN
-from pptx.dml.color import RGBColor
-
-# Spotify brand-ish colors
-BLACK = RGBColor(0x19, 0x19, 0x19)
-WHITE = RGBColor(0xFF, 0xFF, 0xFF)
-GREEN = RGBColor(0x1D, 0xB9, 0x54)
-GRAY = RGBColor(0xB3, 0xB3, 0xB3)
-DARK_GRAY = RGBColor(0x53, 0x53, 0x53)
-
-
-def set_slide_bg(slide, color):
-    background = slide.background
-    fill = background.fill
-    fill.solid()
-    fill.fore_color.rgb = color
-
-
-def add_title_slide(prs, title, subtitle, notes=""):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])  # blank
-    set_slide_bg(slide, BLACK)
-
-    # Title
-    left = Inches(1)
-    top = Inches(2.0)
-    width = Inches(8)
-    height = Inches(1.5)
-    txBox = slide.shapes.add_textbox(left, top, width, height)
-    tf = txBox.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    p.text = title
-    p.font.size = Pt(40)
-    p.font.bold = True
-    p.font.color.rgb = GREEN
-    p.alignment = PP_ALIGN.CENTER
-
-    # Subtitle
-    top2 = Inches(3.6)
-    txBox2 = slide.shapes.add_textbox(left, top2, width, Inches(1.5))
-    tf2 = txBox2.text_frame
-    tf2.word_wrap = True
-    p2 = tf2.paragraphs[0]
-    p2.text = subtitle
-    p2.font.size = Pt(22)
-    p2.font.color.rgb = GRAY
-    p2.alignment = PP_ALIGN.CENTER
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
 
-    if notes:
-        slide.notes_slide.notes_text_frame.text = notes
-
-    return slide
-
-
-def add_content_slide(prs, title, bullets, notes=""):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])  # blank
-    set_slide_bg(slide, BLACK)
-
-    # Title
-    left = Inches(0.8)
-    top = Inches(0.5)
-    width = Inches(8.4)
-    txBox = slide.shapes.add_textbox(left, top, width, Inches(1.0))
-    tf = txBox.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    p.text = title
-    p.font.size = Pt(32)
-    p.font.bold = True
-    p.font.color.rgb = GREEN
-
-    # Bullets
-    top2 = Inches(1.7)
-    txBox2 = slide.shapes.add_textbox(left, top2, width, Inches(5.0))
-    tf2 = txBox2.text_frame
-    tf2.word_wrap = True
-
-    for i, bullet in enumerate(bullets):
-        if i == 0:
-            p = tf2.paragraphs[0]
-        else:
-            p = tf2.add_paragraph()
-            p.space_before = Pt(12)
-        p.text = bullet
-        p.font.size = Pt(22)
-        p.font.color.rgb = WHITE
-        p.level = 0
-
-    if notes:
-        slide.notes_slide.notes_text_frame.text = notes
-
-    return slide
-
-
-def add_section_slide(prs, title, subtitle="", notes=""):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])  # blank
-    set_slide_bg(slide, BLACK)
-
-    top = Inches(2.5)
-    left = Inches(1)
-    width = Inches(8)
-    txBox = slide.shapes.add_textbox(left, top, width, Inches(1.5))
-    tf = txBox.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    p.text = title
-    p.font.size = Pt(38)
-    p.font.bold = True
-    p.font.color.rgb = GREEN
-    p.alignment = PP_ALIGN.CENTER
-
-    if subtitle:
-        top2 = Inches(3.8)
-        txBox2 = slide.shapes.add_textbox(left, top2, width, Inches(1.0))
-        tf2 = txBox2.text_frame
-        tf2.word_wrap = True
-        p2 = tf2.paragraphs[0]
-        p2.text = subtitle
-        p2.font.size = Pt(22)
-        p2.font.color.rgb = GRAY
-        p2.alignment = PP_ALIGN.CENTER
-
-    if notes:
-        slide.notes_slide.notes_text_frame.text = notes
-
-    return slide
-
-
-def add_end_slide(prs, title, lines, notes=""):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])  # blank
-    set_slide_bg(slide, BLACK)
-
-    left = Inches(1)
-    top = Inches(1.5)
-    width = Inches(8)
-    txBox = slide.shapes.add_textbox(left, top, width, Inches(1.2))
-    tf = txBox.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    p.text = title
-    p.font.size = Pt(38)
-    p.font.bold = True
-    p.font.color.rgb = GREEN
-    p.alignment = PP_ALIGN.CENTER
-
-    top2 = Inches(3.0)
-    txBox2 = slide.shapes.add_textbox(left, top2, width, Inches(3.5))
-    tf2 = txBox2.text_frame
-    tf2.word_wrap = True
-    for i, line in enumerate(lines):
-        if i == 0:
-            p = tf2.paragraphs[0]
-        else:
-            p = tf2.add_paragraph()
-            p.space_before = Pt(8)
-        p.text = line
-        p.font.size = Pt(20)
-        p.font.color.rgb = GRAY
-        p.alignment = PP_ALIGN.CENTER
-
-    if notes:
-        slide.notes_slide.notes_text_frame.text = notes
-
-    return slide
-
-
-def main():
-    prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(5.625)  # 16:9
 
+TALK = [
     # ── Slide 1: Title ──
-    add_title_slide(
-        prs,
-        "From Script Kiddie to Spotify",
-        "A 30-Year Journey\n\nGijs Molenaar\nPyCon Namibia 2026",
+    dict(
+        builder="title",
+        title="From Script Kiddie to Spotify",
+        subtitle="A 30-Year Journey\n\nGijs Molenaar\nPyCon Namibia 2026",
         notes=(
             "Welcome everyone. I'm Gijs Molenaar, a software engineer at Spotify. "
             "Today I want to share my 30-year journey in tech — from a curious teenager "
             "in the Netherlands to working at one of the world's biggest music platforms. "
             "This is an honest story about persistence, curiosity, and a lot of luck."
         ),
-    )
+    ),
 
     # ── Slide 2: The Record Store ──
-    add_content_slide(
-        prs,
-        "The Record Store",
-        [
+    dict(
+        builder="content",
+        title="The Record Store",
+        bullets=[
             "My parents owned a record store in the Netherlands",
             "Music was everywhere growing up",
             "Vinyl, CDs, cassettes — the physical music era",
@@ -202,13 +38,13 @@ def main():
             "walls of CDs. This is important because the story comes full circle later. "
             "Keep the record store in mind."
         ),
-    )
+    ),
 
     # ── Slide 3: The Curious Kid ──
-    add_content_slide(
-        prs,
-        "The Curious Kid",
-        [
+    dict(
+        builder="content",
+        title="The Curious Kid",
+        bullets=[
             "Age 14, volunteering at a local TV station",
             "Discovered the Windows NT 'ping of death'",
             "Just a kid playing with scripts I barely understood",
@@ -219,13 +55,13 @@ def main():
             "curious kid playing with security tools — scripts I found online and barely "
             "understood. The classic script kiddie."
         ),
-    )
+    ),
 
     # ── Slide 4: First Job at 15 ──
-    add_content_slide(
-        prs,
-        "First Job at 15",
-        [
+    dict(
+        builder="content",
+        title="First Job at 15",
+        bullets=[
             "The ISP heard about 'the kid who knows security'",
             "Instead of calling the police — they called me",
             "Security consultant at 15 years old",
@@ -239,13 +75,13 @@ def main():
             "equipped to handle these situations. Today, the same curiosity could land "
             "you in jail. Seriously — don't do what I did."
         ),
-    )
+    ),
 
     # ── Slide 5: Finding My Path ──
-    add_content_slide(
-        prs,
-        "Finding My Path",
-        [
+    dict(
+        builder="content",
+        title="Finding My Path",
+        bullets=[
             "MBO in electronics — discovered I didn't want to repair fridges",
             "Got my Cisco CCNA certification",
             "Terrible student → motivated once I found computing",
@@ -261,13 +97,13 @@ def main():
             "Between 15 and 18, I went from one of the worst performers to someone who "
             "genuinely wanted to excel."
         ),
-    )
+    ),
 
     # ── Slide 6: Software Engineering ──
-    add_content_slide(
-        prs,
-        "Software Engineering",
-        [
+    dict(
+        builder="content",
+        title="Software Engineering",
+        bullets=[
             "Bachelor's at Hogeschool van Amsterdam",
             "Bridging the gap from vocational to higher education",
             "Teachers helped me fill the math gaps",
@@ -278,13 +114,13 @@ def main():
             "Teachers at the Hogeschool helped me bridge that gap. This is another example "
             "of people investing in you — if you show willingness to learn, people help."
         ),
-    )
+    ),
 
     # ── Slide 7: Python: Love at First Sight ──
-    add_content_slide(
-        prs,
-        "Python: Love at First Sight",
-        [
+    dict(
+        builder="content",
+        title="Python: Love at First Sight",
+        bullets=[
             "Using Python since that first ISP job — nearly 30 years",
             "Named my company 'Pythonic'",
             "Prototype in Python, optimize later",
@@ -299,13 +135,13 @@ def main():
             "Python 2 to 3 transition, which was a nightmare in science. And now "
             "the modern tooling renaissance with uv and ruff."
         ),
-    )
+    ),
 
     # ── Slide 8: Master's in AI ──
-    add_content_slide(
-        prs,
-        "Master's in Artificial Intelligence",
-        [
+    dict(
+        builder="content",
+        title="Master's in Artificial Intelligence",
+        bullets=[
             "University of Amsterdam",
             "Sonic Gesture: hand movements → MIDI music",
             "Prototyped in Python, rewrote in C++ for real-time",
@@ -319,13 +155,13 @@ def main():
             "of MonetDB, a database system I later worked on as a contractor, and which "
             "inspired DuckDB."
         ),
-    )
+    ),
 
     # ── Slide 9: Open Source ──
-    add_content_slide(
-        prs,
-        "The Power of Open Source",
-        [
+    dict(
+        builder="content",
+        title="The Power of Open Source",
+        bullets=[
             "First contributions to Debian — before GitHub existed",
             "Fix a bug, improve docs, package something",
             "Taught me more than any course",
@@ -339,13 +175,13 @@ def main():
             "connected me with maintainers worldwide, and built a portfolio that opened "
             "doors. You don't need to write a major feature. Start small."
         ),
-    )
+    ),
 
     # ── Slide 10: The Power of Mentors ──
-    add_content_slide(
-        prs,
-        "The Power of Mentors",
-        [
+    dict(
+        builder="content",
+        title="The Power of Mentors",
+        bullets=[
             "Girlfriend's father: science fiction, Rubik's Cubes, Gödel-Escher-Bach",
             "His brother at SARA → internship → scientific computing",
             "Teachers who helped bridge the math gap",
@@ -361,13 +197,13 @@ def main():
             "clients. Each person led to the next. You can't plan this. But you can put "
             "yourself in positions where it might happen."
         ),
-    )
+    ),
 
     # ── Slide 11: The Record Store Dies ──
-    add_content_slide(
-        prs,
-        "The Record Store Dies",
-        [
+    dict(
+        builder="content",
+        title="The Record Store Dies",
+        bullets=[
             "MP3s and online piracy killed the record store",
             "The music industry in crisis",
             "My parents lost their livelihood",
@@ -379,13 +215,13 @@ def main():
             "lost their business. This was personal. Keep this in mind, because the story "
             "comes full circle."
         ),
-    )
+    ),
 
     # ── Slide 12: PhD in South Africa ──
-    add_content_slide(
-        prs,
-        "PhD in South Africa",
-        [
+    dict(
+        builder="content",
+        title="PhD in South Africa",
+        bullets=[
             "Rhodes University, Makhanda",
             "The Square Kilometre Array — the world's largest radio telescope",
             "Radio astronomy meets computer science",
@@ -398,13 +234,13 @@ def main():
             "computer science. The data challenges are enormous — we're talking petabytes "
             "of data per second."
         ),
-    )
+    ),
 
     # ── Slide 13: Meeting My Wife ──
-    add_content_slide(
-        prs,
-        "Meeting My Wife",
-        [
+    dict(
+        builder="content",
+        title="Meeting My Wife",
+        bullets=[
             "Came to South Africa for science",
             "Found love — met a Namibian",
             "Now making Namibia home",
@@ -417,13 +253,13 @@ def main():
             "has taken a role at Hyphen, working on green hydrogen, and we're moving here "
             "with our child. Namibia is becoming home."
         ),
-    )
+    ),
 
     # ── Slide 14: The Freelance Years ──
-    add_content_slide(
-        prs,
-        "The Freelance Years",
-        [
+    dict(
+        builder="content",
+        title="The Freelance Years",
+        bullets=[
             "10+ years consulting: ASTRON, SARAO, SETI, SURFnet",
             "Radio astronomy, ML for energy grids, signal processing",
             "Chasing money made me unhappy",
@@ -436,13 +272,13 @@ def main():
             "the mistake of chasing money. It made me unhappy. The best career decisions "
             "I made were about curiosity, not income."
         ),
-    )
+    ),
 
     # ── Slide 15: Balancing PhD + Freelancing ──
-    add_content_slide(
-        prs,
-        "PhD + Freelancing",
-        [
+    dict(
+        builder="content",
+        title="PhD + Freelancing",
+        bullets=[
             "4 days client work + 1-2 days PhD = 6-day weeks",
             "Exhausting but worth it",
             "Finished just before COVID hit",
@@ -456,13 +292,13 @@ def main():
             "be realistic about the cost. It's possible, but it will consume your life "
             "for a while. Make sure the goal is worth it."
         ),
-    )
+    ),
 
     # ── Slide 16: The Teenage Dream ──
-    add_content_slide(
-        prs,
-        "The Teenage Dream",
-        [
+    dict(
+        builder="content",
+        title="The Teenage Dream",
+        bullets=[
             "Spotify launched in the Netherlands in 2010",
             '"That\'s my dream job"',
             "Twelve years later, I got it",
@@ -474,13 +310,13 @@ def main():
             "I'm now living my teenage dream — and it pays well too. But the money came "
             "from following interesting work, not the other way around."
         ),
-    )
+    ),
 
     # ── Slide 17: Full Circle ──
-    add_content_slide(
-        prs,
-        "Full Circle: Music Saved",
-        [
+    dict(
+        builder="content",
+        title="Full Circle: Music Saved",
+        bullets=[
             "Parents' record store was killed by MP3s",
             "Spotify saved music — a new revenue model for artists",
             "Now I work there",
@@ -493,13 +329,13 @@ def main():
             "to digital disruption, and I ended up at the company that rebuilt the "
             "industry. Life has a sense of humor."
         ),
-    )
+    ),
 
     # ── Slide 18: AI Changed Everything ──
-    add_content_slide(
-        prs,
-        "AI Changed Everything",
-        [
+    dict(
+        builder="content",
+        title="AI Changed Everything",
+        bullets=[
             "I no longer type code — I talk to Claude with voice",
             "This very talk was created with AI",
             "Orders of magnitude faster",
@@ -513,13 +349,13 @@ def main():
             "work orders of magnitude faster, and build things that would have taken "
             "weeks in days."
         ),
-    )
+    ),
 
     # ── Slide 19: What I Built with AI ──
-    add_content_slide(
-        prs,
-        "What I Built with AI",
-        [
+    dict(
+        builder="content",
+        title="What I Built with AI",
+        bullets=[
             "python-snap7 — industrial PLC communication",
             "ableton-claude — control Ableton Live with AI",
             "spectrageist — real-time audio feature extraction",
@@ -535,25 +371,25 @@ def main():
             "charcoaloptimizer for 3D packing, and this CV and talk itself. None of these "
             "would have existed without AI assistance."
         ),
-    )
+    ),
 
     # ── Section Break: Advice ──
-    add_section_slide(
-        prs,
-        "Advice for Young Engineers",
-        "What I wish someone had told me",
+    dict(
+        builder="section",
+        title="Advice for Young Engineers",
+        subtitle="What I wish someone had told me",
         notes=(
             "OK, that's my story. Now let me share some advice. These are the things I "
             "wish someone had told me when I was starting out. Some of it I learned the "
             "hard way."
         ),
-    )
+    ),
 
     # ── Slide 21: Follow Interesting, Not Money ──
-    add_content_slide(
-        prs,
-        "Follow Interesting, Not Money",
-        [
+    dict(
+        builder="content",
+        title="Follow Interesting, Not Money",
+        bullets=[
             "The best career decisions were about curiosity",
             "Chasing money made me unhappy",
             "Money follows interesting work — not the other way around",
@@ -566,13 +402,13 @@ def main():
             "appeared. When I chased money during my consulting years, I was miserable. "
             "When I followed curiosity, the money eventually came anyway."
         ),
-    )
+    ),
 
     # ── Slide 22: Build Real Understanding ──
-    add_content_slide(
-        prs,
-        "Build Real Understanding",
-        [
+    dict(
+        builder="content",
+        title="Build Real Understanding",
+        bullets=[
             "Don't let AI do everything for you",
             "You need to understand how software works",
             "AI amplifies skills — it doesn't replace learning",
@@ -587,13 +423,13 @@ def main():
             "understanding of fundamentals. Your taste, your judgment, your ability to "
             "ask the right questions."
         ),
-    )
+    ),
 
     # ── Slide 23: Contribute to Open Source ──
-    add_content_slide(
-        prs,
-        "Contribute to Open Source",
-        [
+    dict(
+        builder="content",
+        title="Contribute to Open Source",
+        bullets=[
             "Start small — fix bugs, improve docs",
             "Teaches more than any course",
             "Builds your portfolio and reputation",
@@ -607,13 +443,13 @@ def main():
             "and how actual software is built and maintained. And it's your public "
             "portfolio — way more valuable than a certificate."
         ),
-    )
+    ),
 
     # ── Slide 24: The Namibia Advantage ──
-    add_content_slide(
-        prs,
-        "The Namibia Advantage",
-        [
+    dict(
+        builder="content",
+        title="The Namibia Advantage",
+        bullets=[
             "Same timezone as Europe — no midnight meetings",
             "English-speaking — EU companies need you",
             "Lower cost of living than Amsterdam or London",
@@ -629,13 +465,13 @@ def main():
             "I'm literally doing it. The network builds itself if you stay curious, "
             "contribute to open source, and keep showing up."
         ),
-    )
+    ),
 
     # ── Slide 25: But: Work Hard ──
-    add_content_slide(
-        prs,
-        "But: Work Hard",
-        [
+    dict(
+        builder="content",
+        title="But: Work Hard",
+        bullets=[
             "Competitive field — especially now with AI",
             "Don't coast",
             "Stay curious, keep learning",
@@ -648,13 +484,13 @@ def main():
             "top of that baseline. The people who succeed are the ones who keep pushing "
             "when others stop."
         ),
-    )
+    ),
 
     # ── Slide 26: Imposter Syndrome is Normal ──
-    add_content_slide(
-        prs,
-        "Imposter Syndrome is Normal",
-        [
+    dict(
+        builder="content",
+        title="Imposter Syndrome is Normal",
+        bullets=[
             "Early confidence = ignorance (Dunning-Kruger)",
             "Later humility = understanding how much there is to know",
             "It never goes away — it just changes shape",
@@ -668,13 +504,13 @@ def main():
             "The Dunning-Kruger effect is real. If you feel like a fraud sometimes, "
             "welcome to the club. We all feel it."
         ),
-    )
+    ),
 
     # ── Slide 27: The Realistic Path ──
-    add_content_slide(
-        prs,
-        "The Realistic Path",
-        [
+    dict(
+        builder="content",
+        title="The Realistic Path",
+        bullets=[
             "No genius required",
             "No expensive bootcamps needed",
             "Persistence + curiosity + willingness to fail publicly",
@@ -689,13 +525,13 @@ def main():
             "normal. Being a bad student doesn't define you. What defines you is what you "
             "do once you find the thing that lights you up."
         ),
-    )
+    ),
 
     # ── Slide 28: Thank You / Q&A ──
-    add_end_slide(
-        prs,
-        "Thank You!",
-        [
+    dict(
+        builder="end",
+        title="Thank You!",
+        lines=[
             "Gijs Molenaar",
             "Software Engineer @ Spotify",
             "",
@@ -709,11 +545,766 @@ def main():
             "You can find me on GitHub, or reach out by email. "
             "I'm around for the rest of the conference — come say hi!"
         ),
+    ),
+]
+
+
+def load_slides(source, base="."):
+    """Resolve a manifest ``slides`` value: inline list, JSON or Markdown file, or the talk.
+
+    Media paths in the slides are taken relative to the file, or to `base`
+    for an inline list. Raises ValueError for anything but a list of specs.
+    """
+    if source is None:
+        return TALK
+    if isinstance(source, str):
+        path = os.path.join(base, source)
+        if path.endswith(".md"):
+            import md_deck
+
+            return list(md_deck.read_deck(path))
+        with open(path, encoding="utf-8") as f:
+            source = json.load(f)
+        base = os.path.dirname(path)
+    if not isinstance(source, list):
+        raise ValueError("slides must be a list of slide specs or a .json or .md file")
+    return [_resolve_media(spec, base) for spec in source]
+
+
+def _resolve_media(spec, base):
+    value = spec.get("media") if isinstance(spec, dict) else None
+    if isinstance(value, str):
+        return dict(spec, media=os.path.join(base, value))
+    if isinstance(value, dict):
+        value = {
+            key: os.path.join(base, path)
+            if key in ("path", "poster") and isinstance(path, str) and path
+            else path
+            for key, path in value.items()
+        }
+        return dict(spec, media=value)
+    return spec
+
+
+def apply_notes(slides, path):
+    """Return `slides` with the notes in a JSON file mapping slide titles to notes.
+
+    Slides the file doesn't mention keep their own notes. Raises ValueError
+    unless the file holds an object of strings whose keys are all titles.
+    """
+    with open(path, encoding="utf-8") as f:
+        notes = json.load(f)
+    if not isinstance(notes, dict) or not all(isinstance(v, str) for v in notes.values()):
+        raise ValueError("expected an object mapping slide titles to notes")
+    titles = [spec.get("title") if isinstance(spec, dict) else None for spec in slides]
+    unknown = notes.keys() - {title for title in titles if isinstance(title, str)}
+    if unknown:
+        raise ValueError(f"no slides titled {', '.join(map(repr, sorted(unknown)))}")
+    return [
+        dict(spec, notes=notes[title]) if isinstance(title, str) and title in notes else spec
+        for spec, title in zip(slides, titles)
+    ]
+
+
+def read_markdown(path):
+    """Yield the slides of a Markdown deck source as md_deck parses them.
+
+    Exits with the file's problem if it can't be read or parsed.
+    """
+    import md_deck
+
+    try:
+        yield from md_deck.read_deck(path)
+    except (OSError, ValueError) as exc:
+        sys.exit(f"{path}: {exc}")
+
+
+def load_manifest(manifest):
+    """Return the deck entries of a batch manifest and the directory they're relative to.
+
+    Raises ValueError if the manifest isn't an object with a list of deck
+    objects whose ``output`` and ``notes`` are paths.
+    """
+    with open(manifest, encoding="utf-8") as f:
+        decks = json.load(f)
+    decks = decks.get("decks") if isinstance(decks, dict) else None
+    if not isinstance(decks, list):
+        raise ValueError("expected an object with a 'decks' list")
+    for i, deck in enumerate(decks):
+        if not isinstance(deck, dict):
+            raise ValueError(f"deck #{i} must be an object")
+        for key in ("output", "notes"):
+            if not isinstance(deck.get(key, ""), str):
+                raise ValueError(f"deck #{i}: {key} must be a path")
+    return decks, os.path.dirname(os.path.abspath(manifest))
+
+
+# Positional fields of each builder, then the ones it may be given as keywords.
+SLIDE_FIELDS = {
+    "title": (("title", "subtitle"), ("notes",)),
+    "content": (("title", "bullets"), ("notes", "media")),
+    "section": (("title",), ("subtitle", "notes")),
+    "end": (("title", "lines"), ("notes",)),
+}
+
+MAX_BULLETS = 6
+MAX_NOTES_CHARS = 1200
+
+# Unicode blocks the template's theme font (Calibri) has glyphs for; anything
+# else, emoji and their variation selectors in particular, renders as a box or
+# in a fallback font.
+FONT_RANGES = (
+    (0x0020, 0x007E),  # Basic Latin
+    (0x00A0, 0x024F),  # Latin-1 Supplement, Latin Extended-A and -B
+    (0x0370, 0x03FF),  # Greek
+    (0x0400, 0x04FF),  # Cyrillic
+    (0x1E00, 0x1EFF),  # Latin Extended Additional
+    (0x2000, 0x206F),  # General Punctuation
+    (0x20A0, 0x20BF),  # Currency Symbols
+    (0x2100, 0x214F),  # Letterlike Symbols
+    (0x2190, 0x21FF),  # Arrows
+    (0x2200, 0x22FF),  # Mathematical Operators
+)
+
+
+def _unsupported_chars(text):
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if ch in "\n\v" or any(lo <= code <= hi for lo, hi in FONT_RANGES):
+            continue
+        if ch not in chars:
+            chars.append(ch)
+    return ", ".join(f"U+{ord(ch):04X} {ch!r}" for ch in chars)
+
+
+def _media_problems(value):
+    from media import IMAGE_TYPES, VIDEO_TYPES
+
+    if isinstance(value, str):
+        value = {"path": value}
+    if not isinstance(value, dict) or not isinstance(value.get("path"), str):
+        return ["media must be a path or an object with a 'path'"]
+    problems = [f"unexpected media field {key!r}" for key in value.keys() - {"path", "poster"}]
+    for key, types, kind in (
+        ("path", IMAGE_TYPES | VIDEO_TYPES.keys(), "image or video"),
+        ("poster", IMAGE_TYPES, "image"),
+    ):
+        path = value.get(key)
+        if path is None:
+            continue
+        if not isinstance(path, str):
+            problems.append(f"media {key} must be a path")
+        elif os.path.splitext(path)[1].lower() not in types:
+            problems.append(f"media {key} {path!r} is not a supported {kind}")
+        elif not os.path.isfile(path):
+            problems.append(f"media {key} {path!r} does not exist")
+    return problems
+
+
+def check_slides(slides):
+    """Validate slide specs without building them.
+
+    Returns a list of ``(index, level, message)`` where level is "error" for
+    specs the builders would reject or render empty, and "warning" for ones
+    that will build but probably don't look right.
+    """
+    problems = []
+
+    def report(index, level, message):
+        problems.append((index, level, message))
+
+    for index, spec in enumerate(slides):
+        if not isinstance(spec, dict):
+            report(index, "error", f"slide spec must be an object, not {type(spec).__name__}")
+            continue
+        kind = spec.get("builder")
+        if not isinstance(kind, str) or kind not in SLIDE_FIELDS:
+            report(index, "error", f"unknown builder {kind!r}")
+            continue
+        required, optional = SLIDE_FIELDS[kind]
+        for field in required:
+            if field not in spec:
+                report(index, "error", f"missing {field!r}")
+        for field in spec.keys() - {"builder", *required, *optional}:
+            report(index, "error", f"unexpected field {field!r}")
+
+        texts = []
+        for field in ("title", "subtitle", "notes"):
+            value = spec.get(field, "")
+            if not isinstance(value, str):
+                report(index, "error", f"{field} must be a string")
+            else:
+                texts.append((field, value))
+        if isinstance(spec.get("title"), str) and not spec["title"].strip():
+            report(index, "error", "empty title")
+
+        for field in ("bullets", "lines"):
+            if field not in spec:
+                continue
+            items = spec[field]
+            if not isinstance(items, list) or not all(isinstance(i, str) for i in items):
+                report(index, "error", f"{field} must be a list of strings")
+                continue
+            texts.extend((f"{field[:-1]} {i + 1}", item) for i, item in enumerate(items))
+            if field == "bullets" and not items:
+                report(index, "warning", "no bullets")
+            if field == "bullets" and len(items) > MAX_BULLETS:
+                report(index, "warning", f"{len(items)} bullets, more than {MAX_BULLETS} fit")
+
+        if spec.get("media") is not None:
+            for message in _media_problems(spec["media"]):
+                report(index, "error", message)
+
+        notes = spec.get("notes", "")
+        if isinstance(notes, str):
+            if not notes.strip():
+                report(index, "warning", "no speaker notes")
+            elif len(notes) > MAX_NOTES_CHARS:
+                report(
+                    index,
+                    "warning",
+                    f"notes are {len(notes)} characters, more than {MAX_NOTES_CHARS}",
+                )
+
+        for field, text in texts:
+            if field == "notes":
+                continue
+            unsupported = _unsupported_chars(text)
+            if unsupported:
+                report(index, "warning", f"{field} has characters the font lacks: {unsupported}")
+
+    return problems
+
+
+def check_deck(slides, name):
+    """Print the problems found in a deck; return how many are errors."""
+    errors = 0
+    for index, level, message in check_slides(slides):
+        title = slides[index].get("title", "") if isinstance(slides[index], dict) else ""
+        print(f"{name}: slide {index + 1} ({title}): {level}: {message}")
+        errors += level == "error"
+    return errors
+
+
+def _build_deck_job(
+    deck, base, reproducible=False, compress_level=None, autofit=False, styled=False
+):
+    # Runs in a worker process; any exception is reported for this deck only.
+    start = time.perf_counter()
+    output = os.path.join(base, deck["output"])
+    import slides
+
+    deck_slides = load_slides(deck.get("slides"), base)
+    if "notes" in deck:
+        deck_slides = apply_notes(deck_slides, os.path.join(base, deck["notes"]))
+    prs = slides.build_presentation(deck_slides, autofit=autofit, styled=styled)
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    if reproducible:
+        slides.save_reproducible(prs, output, compress_level=compress_level)
+    else:
+        slides.save(prs, output, compress_level)
+    return len(prs.slides), time.perf_counter() - start
+
+
+def build_batch(
+    manifest, workers=None, reproducible=False, compress_level=None, autofit=False, styled=False
+):
+    """Build every deck in a JSON manifest in parallel; return the failure count.
+
+    The manifest looks like ``{"decks": [{"output": "out/a.pptx", "slides": ...}]}``
+    where ``slides`` is an inline list of slide specs, a path to a JSON file
+    holding one, or omitted for the talk. An optional ``notes`` names a JSON
+    file for apply_notes(). Paths are relative to the manifest.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    try:
+        decks, base = load_manifest(manifest)
+    except (OSError, ValueError) as exc:
+        sys.exit(f"{manifest}: {exc}")
+
+    start = time.perf_counter()
+    total_slides = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for i, deck in enumerate(decks):
+            future = pool.submit(
+                _build_deck_job, deck, base, reproducible, compress_level, autofit, styled
+            )
+            futures[future] = deck.get("output", f"deck #{i}")
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                n_slides, elapsed = future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"FAILED {name}: {type(exc).__name__}: {exc}", file=sys.stderr)
+                continue
+            total_slides += n_slides
+            print(f"Saved {name} with {n_slides} slides in {elapsed:.2f}s")
+    wall = time.perf_counter() - start
+
+    print(
+        f"Built {len(decks) - failed}/{len(decks)} decks, {total_slides} slides "
+        f"in {wall:.2f}s ({total_slides / wall:.1f} slides/s)"
+    )
+    return failed
+
+
+# How often watched files are polled, and how long they must stay unchanged
+# before a rebuild starts, in seconds.
+WATCH_INTERVAL = 0.05
+WATCH_DEBOUNCE = 0.1
+
+
+def _mtimes(paths):
+    stamps = {}
+    for path in paths:
+        try:
+            stamps[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            stamps[path] = None
+    return stamps
+
+
+def load_talk(path=__file__):
+    """Read TALK afresh from the deck source, without running its main()."""
+    import runpy
+
+    return runpy.run_path(path)["TALK"]
+
+
+def watch(
+    output,
+    notes=None,
+    autofit=False,
+    styled=False,
+    compress_level=None,
+    markdown=None,
+    reproducible=False,
+):
+    """Rebuild `output` whenever the deck source, talk.md or the notes file changes.
+
+    With `markdown`, the deck is compiled from that Markdown source instead,
+    and it is watched in place of this file and talk.md. Runs until
+    interrupted. python-pptx, the template and the slide prototypes
+    stay loaded, so a rebuild only re-reads the source, builds and saves.
+    Changes are debounced; a change made during a build queues one more
+    build. The deck is written to a temporary file and moved into place, so
+    viewers never see it half-written; with `reproducible`, as by
+    slides.save_reproducible().
+    """
+    import threading
+
+    import slides
+
+    if markdown:
+        paths = [os.path.abspath(markdown)]
+    else:
+        here = os.path.dirname(os.path.abspath(__file__))
+        paths = [os.path.abspath(__file__), os.path.join(here, "talk.md")]
+    if notes:
+        paths.append(os.path.abspath(notes))
+
+    pending = threading.Event()
+
+    def rebuild():
+        start = time.perf_counter()
+        try:
+            if markdown:
+                import md_deck
+
+                talk = list(md_deck.read_deck(markdown))
+            else:
+                talk = load_talk(paths[0])
+            if notes:
+                talk = apply_notes(talk, notes)
+            prs = slides.build_presentation(talk, autofit=autofit, styled=styled)
+            partial = output + ".partial"
+            if reproducible:
+                slides.save_reproducible(prs, partial, compress_level=compress_level)
+            else:
+                slides.save(prs, partial, compress_level)
+            os.replace(partial, output)
+        except Exception as exc:
+            print(f"Build failed: {type(exc).__name__}: {exc}", file=sys.stderr)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Saved {output} with {len(prs.slides)} slides in {elapsed:.0f} ms", flush=True)
+
+    def builder():
+        while True:
+            pending.wait()
+            pending.clear()
+            rebuild()
+
+    rebuild()
+    threading.Thread(target=builder, daemon=True).start()
+    print(f"Watching {', '.join(os.path.relpath(p) for p in paths)}; Ctrl-C to stop")
+
+    seen = _mtimes(paths)
+    changed_at = None
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            current = _mtimes(paths)
+            if current != seen:
+                seen = current
+                changed_at = time.monotonic()
+            elif changed_at and time.monotonic() - changed_at >= WATCH_DEBOUNCE:
+                changed_at = None
+                pending.set()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-o", "--output", default="talk.pptx")
+    parser.add_argument(
+        "--batch", metavar="MANIFEST", help="build every deck listed in a JSON manifest"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="worker processes for --batch and --serve (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help="serve POST /build on localhost, building decks on --workers warm processes",
     )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=256,
+        help="size limit of the --serve result cache (default: 256)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="validate the deck (or every deck in --batch) without building it",
+    )
+    parser.add_argument(
+        "--overflow",
+        action="store_true",
+        help="report text that runs off its slide, estimated from font metrics",
+    )
+    parser.add_argument(
+        "--autofit",
+        action="store_true",
+        help="shrink text that would run off its slide to the largest size that fits",
+    )
+    parser.add_argument(
+        "--styled",
+        action="store_true",
+        help="put formatting and background in generated layouts; slides carry only text",
+    )
+    parser.add_argument(
+        "--preview",
+        metavar="HTML",
+        help="write an HTML page with an SVG per slide instead of building the deck",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="stay running and rebuild whenever the deck source or talk.md changes",
+    )
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help="same slides, same bytes: pin zip dates and document properties "
+        "(to SOURCE_DATE_EPOCH if set)",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        choices=range(10),
+        metavar="0-9",
+        help="deflate level of the saved deck; 0 stores parts uncompressed, "
+        "for the fastest development builds (default: 6)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild slides that changed since the last --incremental build",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="write parts one by one, releasing each; '-o -' writes to stdout",
+    )
+    parser.add_argument(
+        "--split-slides",
+        type=int,
+        metavar="N",
+        help="write the deck as <output>-001.pptx, -002, ... of at most N slides each",
+    )
+    parser.add_argument(
+        "--split-mb",
+        type=float,
+        metavar="MB",
+        help="like --split-slides, capping each part at MB megabytes; "
+        "parts break before section slides where possible",
+    )
+    parser.add_argument(
+        "--patch",
+        nargs=3,
+        action="append",
+        metavar=("SLIDE", "FIELD", "TEXT"),
+        help="edit the title, subtitle, bullets, lines or notes of slide SLIDE "
+        "(a number, or a title; '=' before a title that is all digits) in the "
+        "existing deck in place; bullets and lines take one per line or a JSON "
+        "list of strings; repeatable",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="trace time and memory per build stage of a plain or --stream build into "
+        "<output>.trace.json (Chrome trace) and <output>.profile.json",
+    )
+    parser.add_argument(
+        "--markdown",
+        metavar="FILE",
+        help="build the deck from a Markdown source (see md_deck.py) instead of TALK; "
+        "slides are built as they are parsed",
+    )
+    parser.add_argument(
+        "--notes",
+        metavar="FILE",
+        help="JSON file mapping slide titles to speaker notes, overriding the built-in ones",
+    )
+    args = parser.parse_args()
+    # Modes that replace a plain build, and so ignore how one is traced,
+    # streamed or split.
+    modes = {
+        "--check": args.check,
+        "--serve": args.serve is not None,
+        "--batch": args.batch,
+        "--watch": args.watch,
+        "--patch": args.patch,
+        "--overflow": args.overflow,
+        "--preview": args.preview,
+        "--incremental": args.incremental,
+        "--split-slides": args.split_slides,
+        "--split-mb": args.split_mb,
+    }
+    # Only a plain or --stream build goes through the traced stages; the
+    # split options go together.
+    plain_only = {
+        "--profile": (args.profile, ()),
+        "--stream": (args.stream, ()),
+        "--split-slides": (args.split_slides, ("--split-mb",)),
+        "--split-mb": (args.split_mb, ("--split-slides",)),
+    }
+    for option, (given, allowed) in plain_only.items():
+        for flag, used in modes.items():
+            if given and used and flag != option and flag not in allowed:
+                parser.error(f"{option} can't be combined with {flag}")
 
-    output = "talk.pptx"
-    prs.save(output)
-    print(f"Saved {output} with {len(prs.slides)} slides")
+    talk = read_markdown(args.markdown) if args.markdown else TALK
+    if args.notes:
+        try:
+            talk = apply_notes(list(talk), args.notes)
+        except (OSError, ValueError) as exc:
+            sys.exit(f"{args.notes}: {exc}")
+
+    if args.check:
+        if args.batch:
+            try:
+                decks, base = load_manifest(args.batch)
+            except (OSError, ValueError) as exc:
+                sys.exit(f"{args.batch}: {exc}")
+            errors = 0
+            for i, deck in enumerate(decks):
+                name = deck.get("output", f"deck #{i}")
+                try:
+                    slides = load_slides(deck.get("slides"), base)
+                    if "notes" in deck:
+                        slides = apply_notes(slides, os.path.join(base, deck["notes"]))
+                except (OSError, ValueError) as exc:
+                    print(f"{name}: error: {exc}")
+                    errors += 1
+                    continue
+                errors += check_deck(slides, name)
+        else:
+            errors = check_deck(list(talk), args.output)
+        sys.exit(1 if errors else 0)
+
+    if args.serve is not None:
+        from service import serve
+
+        serve(args.serve, workers=args.workers, cache_mb=args.cache_mb)
+        return
+
+    if args.batch:
+        failed = build_batch(
+            args.batch,
+            args.workers,
+            args.reproducible,
+            args.compress_level,
+            args.autofit,
+            args.styled,
+        )
+        sys.exit(1 if failed else 0)
+
+    if args.watch:
+        watch(
+            args.output,
+            args.notes,
+            autofit=args.autofit,
+            styled=args.styled,
+            compress_level=args.compress_level,
+            markdown=args.markdown,
+            reproducible=args.reproducible,
+        )
+        return
+
+    if args.patch:
+        import opc
+
+        edits = []
+        for slide, field, text in args.patch:
+            if field not in opc.PATCH_FIELDS:
+                parser.error(f"--patch: FIELD must be one of {', '.join(opc.PATCH_FIELDS)}")
+            if field in ("title", "subtitle"):
+                paragraphs = [text]
+            else:
+                paragraphs = text.split("\n")
+            if field in ("bullets", "lines") and text.startswith("["):
+                try:
+                    value = json.loads(text)
+                except ValueError:
+                    value = None
+                # Text like "[Demo clip]" is a line of its own, not a list.
+                if isinstance(value, list) and all(isinstance(v, str) for v in value):
+                    paragraphs = value
+            if slide.startswith("="):
+                slide = slide[1:]
+            elif slide.isdigit():
+                slide = int(slide)
+            edits.append((slide, field, paragraphs))
+        start = time.perf_counter()
+        try:
+            edited = opc.patch_text(args.output, edits)
+        except (OSError, ValueError, KeyError) as exc:
+            sys.exit(f"{args.output}: {exc}")
+        print(
+            f"Patched slides {', '.join(map(str, sorted(set(edited))))} of {args.output} "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        return
+
+    tracer = None
+    if args.profile:
+        from tracing import StageTracer
+
+        tracer = StageTracer()
+    stage = tracer.stage if tracer else lambda name, category: nullcontext()
+
+    with stage("import python-pptx", "import"):
+        import slides
+
+    if args.overflow or args.preview or args.incremental or args.split_slides or args.split_mb:
+        talk = list(talk)  # only a plain build takes slides as they are parsed
+
+    if args.overflow:
+        overflows = 0
+        for index, boxes in enumerate(slides.measure_slides(talk)):
+            for box_index, box in enumerate(boxes):
+                if box["overflow"]:
+                    overflows += 1
+                    print(
+                        f"{args.output}: slide {index + 1} ({talk[index]['title']}): "
+                        f"textbox {box_index + 1} needs {box['height']:.0f}pt, "
+                        f"has {box['available']:.0f}pt; fits at {box['fit_size']}pt"
+                    )
+        import text_fit
+
+        print(f"{overflows} overflowing textboxes, measured with {text_fit.font_note()}")
+        sys.exit(1 if overflows else 0)
+
+    if args.preview:
+        slides.write_preview(talk, args.preview, autofit=args.autofit)
+        print(f"Wrote preview of {len(talk)} slides to {args.preview}")
+        return
+
+    if args.incremental:
+        slides.build_incremental(
+            talk,
+            args.output,
+            reproducible=args.reproducible,
+            compress_level=args.compress_level,
+            autofit=args.autofit,
+            styled=args.styled,
+        )
+        return
+
+    if args.split_slides or args.split_mb:
+        parts = slides.build_split(
+            talk,
+            args.output,
+            max_slides=args.split_slides,
+            max_bytes=args.split_mb and int(args.split_mb * 1024 * 1024),
+            autofit=args.autofit,
+            styled=args.styled,
+            timestamp=slides.reproducible_timestamp() if args.reproducible else None,
+            compress_level=args.compress_level,
+        )
+        for path, n_slides, size in parts:
+            print(f"Saved {path} with {n_slides} slides, {size / 1024:.0f} KB")
+        print(
+            f"Split {len(talk)} slides into {len(parts)} parts, "
+            f"peak RSS {slides.peak_rss_mb():.1f} MB"
+        )
+        return
+
+    prs = slides.build_presentation(talk, tracer, autofit=args.autofit, styled=args.styled)
+    n_slides = len(prs.slides)
+    if args.stream:
+        to_stdout = args.output == "-"
+        with stage("save", "save"):
+            slides.save_streaming(
+                prs,
+                sys.stdout.buffer if to_stdout else args.output,
+                slides.reproducible_timestamp() if args.reproducible else None,
+                args.compress_level,
+            )
+        print(
+            f"Saved {'stdout' if to_stdout else args.output} with {n_slides} slides, "
+            f"peak RSS {slides.peak_rss_mb():.1f} MB",
+            file=sys.stderr if to_stdout else sys.stdout,
+        )
+    else:
+        with stage("save", "save"):
+            if args.reproducible:
+                slides.save_reproducible(prs, args.output, compress_level=args.compress_level)
+            else:
+                slides.save(prs, args.output, args.compress_level)
+        print(f"Saved {args.output} with {n_slides} slides")
+
+    if tracer:
+        # A deck written to stdout is named after its source for the trace files.
+        to_stdout = args.output == "-"
+        if not to_stdout:
+            prefix = args.output
+        elif args.markdown:
+            prefix = os.path.splitext(args.markdown)[0] + ".pptx"
+        else:
+            prefix = parser.get_default("output")
+        tracer.write(prefix)
+        summary = tracer.summary()
+        stages = ", ".join(
+            f"{category} {total['total_ms']:.0f} ms"
+            for category, total in summary["categories"].items()
+        )
+        print(
+            f"Profile: {stages}; wrote {prefix}.trace.json and {prefix}.profile.json",
+            file=sys.stderr if to_stdout else sys.stdout,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""Compile a Markdown deck source into slide specs, yielding each slide as it is read.
+
+    # From Script Kiddie to Spotify {.title}
+    A 30-Year Journey
+
+    Gijs Molenaar
+
+    ## The Record Store
+    - My dad owned a record store
+    - **Music** everywhere
+    ![](shots/store.png)
+
+    ::: notes
+    My dad owned a record store in the Netherlands.
+    :::
+
+    # Thank You {.end}
+    - gijs@pythonic.nl
+
+A level-1 heading starts a section slide and a level-2 heading a content
+slide; ``{.title}``, ``{.section}``, ``{.content}`` or ``{.end}`` after a
+heading picks the builder instead. List items are the bullets of a content
+slide or the lines of an end slide; text on title and section slides is
+their subtitle, one paragraph per blank-line-separated block. An image on
+its own line is a content slide's media, relative to the source. A ``:::
+notes`` block holds the speaker notes. Text before the first heading is
+ignored, and inline emphasis, code and links are reduced to their text.
+
+Only the slide being read is held in memory, so a source of any size is
+compiled in one pass at constant memory per slide.
+"""
+
+import os
+import re
+
+HEADING = re.compile(r"(#{1,2})\s+(.*?)\s*(?:\{\.(\w+)\})?\s*#*\s*$")
+LIST_ITEM = re.compile(r"\s*(?:[-*+]|\d+[.)])\s+(.*)")
+IMAGE = re.compile(r"!\[[^\]]*\]\(\s*<?([^)>\s]+)>?(?:\s+\"[^\"]*\")?\s*\)\s*$")
+NOTES_START = re.compile(r":{3,}\s*\{?\.?notes\}?\s*$")
+NOTES_END = re.compile(r":{3,}\s*$")
+RULE = re.compile(r"(-{3,}|\*{3,}|_{3,})$")
+
+# Inline markup and what to keep of it.
+INLINE = [
+    (re.compile(r"!?\[([^\]]*)\]\([^)]*\)"), r"\1"),  # links and inline images
+    (re.compile(r"`([^`]*)`"), r"\1"),
+    (re.compile(r"(\*\*|__)(.+?)\1"), r"\2"),
+    (re.compile(r"(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])"), r"\1"),
+    (re.compile(r"\\([\\`*_{}\[\]()#+\-.!])"), r"\1"),
+]
+
+BUILDERS = ("title", "content", "section", "end")
+
+
+def inline_text(text):
+    """`text` with its Markdown emphasis, code spans and links reduced to plain text."""
+    for pattern, replacement in INLINE:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class _Slide:
+    # What has been read of one slide so far.
+
+    def __init__(self, builder, title):
+        self.builder = builder
+        self.title = title
+        self.items = []  # bullets or lines
+        self.paragraphs = [[]]  # subtitle lines, by paragraph
+        self.notes = [[]]
+        self.media = None
+        self.continues = False  # the last line was a list item or its continuation
+
+    def spec(self):
+        spec = {"builder": self.builder, "title": self.title}
+        paragraphs = ["\n".join(lines) for lines in self.paragraphs if lines]
+        if self.builder == "content":
+            spec["bullets"] = self.items
+        elif self.builder == "end":
+            spec["lines"] = self.items
+        elif paragraphs or self.builder == "title":
+            spec["subtitle"] = "\n\n".join(paragraphs)
+        notes = "\n".join(" ".join(lines) for lines in self.notes if lines)
+        if notes:
+            spec["notes"] = notes
+        if self.media:
+            spec["media"] = self.media
+        return spec
+
+
+def parse(lines, base="."):
+    """Yield the slide spec of every slide in Markdown `lines`, as soon as it ends.
+
+    Image paths are taken relative to `base`. Raises ValueError, with the
+    line number, for an unknown ``{.class}`` or an unterminated notes block.
+    """
+    slide = None
+    in_notes = False
+    number = 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+
+        if in_notes:
+            if NOTES_END.match(stripped):
+                in_notes = False
+            elif stripped:
+                slide.notes[-1].append(inline_text(stripped))
+            elif slide.notes[-1]:
+                slide.notes.append([])
+            continue
+
+        heading = HEADING.match(line)
+        if heading:
+            if slide:
+                yield slide.spec()
+            level, title, cls = heading.groups()
+            builder = cls or ("section" if level == "#" else "content")
+            if builder not in BUILDERS:
+                raise ValueError(f"line {number}: unknown slide class {{.{cls}}}")
+            slide = _Slide(builder, inline_text(title))
+            continue
+        if slide is None:
+            continue
+
+        if NOTES_START.match(stripped):
+            in_notes = True
+            slide.continues = False
+            continue
+        if not stripped or RULE.match(stripped):
+            slide.continues = False
+            if slide.paragraphs[-1]:
+                slide.paragraphs.append([])
+            continue
+
+        image = IMAGE.match(stripped)
+        if image and slide.builder == "content":
+            slide.media = os.path.join(base, image.group(1))
+            continue
+        item = LIST_ITEM.match(line)
+        if item and slide.builder in ("content", "end"):
+            slide.items.append(inline_text(item.group(1)))
+            slide.continues = True
+        elif slide.continues:
+            slide.items[-1] += " " + inline_text(stripped)
+        elif slide.builder in ("content", "end"):
+            slide.items.append(inline_text(stripped))
+            slide.continues = True
+        else:
+            slide.paragraphs[-1].append(inline_text(stripped))
+
+    if in_notes:
+        raise ValueError(f"line {number}: notes block of slide {slide.title!r} is not closed")
+    if slide:
+        yield slide.spec()
+
+
+def read_deck(path):
+    """Yield the slide specs of the Markdown deck at `path`, reading it line by line."""
+    with open(path, encoding="utf-8") as f:
+        yield from parse(f, os.path.dirname(path))
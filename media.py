@@ -0,0 +1,94 @@
+"""Prepare slide media: downscale images to slide resolution, cached by content.
+
+An image larger than the box it is shown in is resized with Pillow to the
+box's size at MEDIA_DPI and written to CACHE_DIR under a hash of its bytes
+and target size, so each image is processed once across builds and decks.
+Images that already fit are used as they are. Identical output bytes are
+what let slides.add_picture() store an image once per package. Pillow is
+imported only to read or resize an image, so the media types can be checked
+without it.
+"""
+
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 1920 pixels across the 10" slide.
+MEDIA_DPI = 192
+CACHE_DIR = ".media_cache"
+
+IMAGE_TYPES = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff"}
+VIDEO_TYPES = {".mp4": "video/mp4", ".m4v": "video/x-m4v", ".mov": "video/quicktime"}
+
+# Bump when the resizing or encoding changes, to invalidate cached files.
+CACHE_VERSION = "1"
+
+# (path, size, mtime, width, height) -> prepared path, for this process.
+_prepared = {}
+
+
+def is_video(path):
+    return os.path.splitext(path)[1].lower() in VIDEO_TYPES
+
+
+def image_size(path):
+    """Width and height of an image in pixels."""
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as im:
+        return ImageOps.exif_transpose(im).size
+
+
+def prepare_image(path, max_width, max_height, cache_dir=CACHE_DIR):
+    """Path of `path` downscaled to fit `max_width` x `max_height` pixels.
+
+    Returns `path` itself when the image already fits.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, max_width, max_height)
+    prepared = _prepared.get(key)
+    if prepared:
+        return prepared
+
+    with open(path, "rb") as f:
+        blob = f.read()
+    ext = os.path.splitext(path)[1].lower()
+    digest = hashlib.sha256(blob)
+    digest.update(f"{CACHE_VERSION} {max_width}x{max_height}".encode())
+    cached = os.path.join(cache_dir, digest.hexdigest() + ext)
+    if os.path.exists(cached):
+        prepared = cached
+    else:
+        from PIL import Image, ImageOps
+
+        with Image.open(io.BytesIO(blob)) as im:
+            image_format = im.format
+            im = ImageOps.exif_transpose(im)
+            if im.width <= max_width and im.height <= max_height:
+                prepared = path
+            else:
+                im.thumbnail((max_width, max_height), Image.LANCZOS)
+                os.makedirs(cache_dir, exist_ok=True)
+                partial = f"{cached}.{os.getpid()}.partial"
+                if image_format == "JPEG":
+                    im.save(partial, "JPEG", quality=90)
+                else:
+                    im.save(partial, image_format or "PNG")
+                os.replace(partial, cached)
+                prepared = cached
+    _prepared[key] = prepared
+    return prepared
+
+
+def prepare_images(jobs, workers=None):
+    """Run prepare_image() over ``(path, max_width, max_height)`` jobs in threads.
+
+    Pillow releases the GIL while decoding, resizing and encoding. Returns
+    the prepared paths in the order of `jobs`.
+    """
+    jobs = list(jobs)
+    if len(jobs) < 2:
+        return [prepare_image(*job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda job: prepare_image(*job), jobs))
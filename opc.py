@@ -0,0 +1,287 @@
+"""Read and rewrite .pptx packages at the zip level, without python-pptx.
+
+Everything here works on the raw Open Packaging Convention (OPC) layout of a
+presentation: zip members, their ``_rels`` files and ``presentation.xml``,
+and the text of single slides, edited in place with lxml.
+"""
+
+import os
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from copy import deepcopy
+
+from lxml import etree
+
+NS_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+RT_SLIDE_LAYOUT = NS_R + "/slideLayout"
+RT_NOTES_SLIDE = NS_R + "/notesSlide"
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+# Bytes read and written at a time when copying members through.
+COPY_BLOCK = 1024 * 1024
+
+
+def part_rels(zf, partname):
+    """Map rId -> (reltype, target partname) for a part in an open package zip."""
+    directory, name = posixpath.split(partname)
+    rels_name = posixpath.join(directory, "_rels", name + ".rels")
+    if rels_name not in zf.namelist():
+        return {}
+    rels = {}
+    for rel in ET.fromstring(zf.read(rels_name)).iter(f"{{{NS_REL}}}Relationship"):
+        target = rel.get("Target")
+        if rel.get("TargetMode") != "External":
+            target = posixpath.normpath(posixpath.join(directory, target))
+        rels[rel.get("Id")] = (rel.get("Type"), target)
+    return rels
+
+
+def slide_partnames(zf):
+    """Zip member names of the slides of a package, in presentation order."""
+    rels = part_rels(zf, "ppt/presentation.xml")
+    root = ET.fromstring(zf.read("ppt/presentation.xml"))
+    return [
+        rels[sldId.get(f"{{{NS_R}}}id")][1]
+        for sldId in root.iter(f"{{{NS_P}}}sldId")
+    ]
+
+
+def _copy_members(zin, zout, infos, end):
+    # Copy the local entries of `infos`, which run from the first one's
+    # offset to `end` in the input, as they are; only their offsets in the
+    # central directory change.
+    if not infos:
+        return
+    start = infos[0].header_offset
+    shift = zout.fp.tell() - start
+    zin.fp.seek(start)
+    remaining = end - start
+    while remaining:
+        block = zin.fp.read(min(remaining, COPY_BLOCK))
+        zout.fp.write(block)
+        remaining -= len(block)
+    for info in infos:
+        info.header_offset += shift
+        _record(zout, info)
+
+
+def _record(zout, info):
+    # Enter a member written straight to zout.fp into the central directory.
+    zout.filelist.append(info)
+    zout.NameToInfo[info.filename] = info
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True  # so close() writes the central directory
+
+
+def write_compressed(zout, info, data, crc, file_size):
+    """Add a member whose `data` is already compressed as ``info.compress_type`` says.
+
+    `crc` and `file_size` are those of the uncompressed content. This lets
+    members be compressed elsewhere, on other threads, and still be written
+    in order, with the same bytes ``zout.writestr()`` would have written.
+    """
+    info.flag_bits = 0
+    info.CRC = crc
+    info.file_size = file_size
+    info.compress_size = len(data)
+    info.header_offset = zout.fp.tell()
+    zout.fp.write(info.FileHeader())
+    zout.fp.write(data)
+    _record(zout, info)
+
+
+def _write_replaced(zin, path, replace):
+    # Write the members of the open package `zin` to a new zip at `path`,
+    # replacing those ``replace(zin, info)`` returns new content for.
+    # Returns how many were replaced.
+    infos = sorted(zin.infolist(), key=lambda info: info.header_offset)
+    ends = [info.header_offset for info in infos[1:]] + [zin.start_dir]
+    replaced = 0
+    with zipfile.ZipFile(path, "w") as zout:
+        run, run_end = [], 0
+        for info, end in zip(infos, ends):
+            data = replace(zin, info)
+            if data is None:
+                run.append(info)
+                run_end = end
+                continue
+            _copy_members(zin, zout, run, run_end)
+            run = []
+            zout.writestr(info, data)
+            replaced += 1
+        _copy_members(zin, zout, run, run_end)
+    return replaced
+
+
+def transform_package(path, replace, output=None):
+    """Rewrite the zip at `path` to `output` (default: in place) one member at a time.
+
+    ``replace(zin, info)`` gets the open input and each member's ZipInfo and
+    returns its new content, or None to keep it. Kept members are copied
+    through byte for byte, still compressed, each run of them in one go, and
+    replaced ones keep their name, date and compression. The new file is
+    moved into place once complete. Returns the number of members replaced.
+    """
+    output = output or path
+    with zipfile.ZipFile(path) as zin:
+        replaced = _write_replaced(zin, output + ".tmp", replace)
+    os.replace(output + ".tmp", output)
+    return replaced
+
+
+def rewrite_package(path, replacements):
+    """Rewrite the zip at `path` with the members in `replacements` replaced."""
+    transform_package(path, lambda zin, info: replacements.get(info.filename))
+
+
+# Which textbox of a slide each field of a slide spec is in.
+PATCH_FIELDS = {"title": 0, "subtitle": 1, "bullets": 1, "lines": 1, "notes": None}
+
+
+def _a(tag):
+    return f"{{{NS_A}}}{tag}"
+
+
+def _p(tag):
+    return f"{{{NS_P}}}{tag}"
+
+
+def text_bodies(root):
+    """The ``a:txBody`` of every shape on a slide or notes slide, in drawing order."""
+    spTree = root.find(f"{_p('cSld')}/{_p('spTree')}")
+    return [sp.find(_p("txBody")) for sp in spTree.findall(_p("sp"))]
+
+
+def notes_body(root):
+    """The ``a:txBody`` of a notes slide's notes placeholder."""
+    for sp in root.find(f"{_p('cSld')}/{_p('spTree')}").findall(_p("sp")):
+        ph = sp.find(f"{_p('nvSpPr')}/{_p('nvPr')}/{_p('ph')}")
+        if ph is not None and ph.get("type") == "body":
+            return sp.find(_p("txBody"))
+    return None
+
+
+# What splits a paragraph's text into lines, as in python-pptx's append_text().
+LINE_BREAK = re.compile("\n|\v")
+
+
+def set_paragraphs(txBody, paragraphs):
+    """Replace the text of an ``a:txBody`` with `paragraphs`, keeping its formatting.
+
+    The first paragraph is formatted like the first old one and the others
+    like the last old one, as slides.stamp_slide() lays out new text. A
+    newline or vertical tab within a paragraph becomes an ``a:br`` between
+    runs, as python-pptx's ``append_text()`` writes it.
+    """
+    old = txBody.findall(_a("p"))
+    templates = [old[0], old[-1]] if old else [etree.Element(_a("p"))]
+    for p in old:
+        txBody.remove(p)
+    for i, text in enumerate(paragraphs or [""]):
+        p = deepcopy(templates[min(i, len(templates) - 1)])
+        rPr = p.find(f"{_a('r')}/{_a('rPr')}")
+        for child in p.findall("*"):
+            if child.tag in (_a("r"), _a("br"), _a("fld")):
+                p.remove(child)
+        end = p.find(_a("endParaRPr"))
+        for j, line in enumerate(LINE_BREAK.split(text)):
+            children = []
+            if j > 0:
+                children.append(etree.Element(_a("br")))
+            if line:  # no empty runs, as append_text() doesn't add them
+                r = etree.Element(_a("r"))
+                if rPr is not None:
+                    r.append(deepcopy(rPr))
+                etree.SubElement(r, _a("t")).text = line
+                children.append(r)
+            for child in children:
+                if end is None:
+                    p.append(child)
+                else:
+                    end.addprevious(child)
+        txBody.append(p)
+
+
+def paragraph_text(p):
+    """The text of an ``a:p``, with its line breaks as newlines."""
+    return "".join(
+        "\n" if child.tag == _a("br") else "".join(t.text or "" for t in child.iter(_a("t")))
+        for child in p
+    )
+
+
+def box_text(txBody):
+    """The text of a textbox, its paragraphs and line breaks separated by newlines."""
+    return "\n".join(paragraph_text(p) for p in txBody.iter(_a("p")))
+
+
+def patch_text(path, edits):
+    """Apply ``(slide, field, paragraphs)`` edits to the deck at `path`, in place.
+
+    `slide` is a 1-based slide number (an int) or a slide title; `field` is a
+    key of PATCH_FIELDS. Only the slides an edit addresses are parsed, plus
+    the slides before the first one with a title looked for, and every other
+    member is copied through compressed, so an edit takes about as long in a
+    long deck as in a short one. Raises ValueError for a slide that doesn't
+    exist or has no such textbox, or for notes on a slide without any: those
+    need a full build. Returns the numbers of the edited slides.
+    """
+    trees = {}
+    changed = set()
+    edited = []
+    with zipfile.ZipFile(path) as zf:
+
+        def tree(partname):
+            if partname not in trees:
+                trees[partname] = etree.fromstring(zf.read(partname))
+            return trees[partname]
+
+        partnames = slide_partnames(zf)
+        for slide, field, paragraphs in edits:
+            if isinstance(slide, int):
+                if not 1 <= slide <= len(partnames):
+                    raise ValueError(f"no slide {slide}; the deck has {len(partnames)}")
+                index = slide - 1
+            else:
+                index = next(
+                    (
+                        i
+                        for i, partname in enumerate(partnames)
+                        if box_text(text_bodies(tree(partname))[0]) == slide
+                    ),
+                    None,
+                )
+                if index is None:
+                    raise ValueError(f"no slide titled {slide!r}")
+            partname = partnames[index]
+            if field == "notes":
+                notes = [
+                    target
+                    for reltype, target in part_rels(zf, partname).values()
+                    if reltype == RT_NOTES_SLIDE
+                ]
+                partname = notes[0] if notes else None
+                txBody = notes_body(tree(partname)) if notes else None
+            else:
+                bodies = text_bodies(tree(partname))
+                box = PATCH_FIELDS[field]
+                txBody = bodies[box] if box < len(bodies) else None
+            if txBody is None:
+                raise ValueError(f"slide {index + 1} has no {field} to replace")
+            set_paragraphs(txBody, paragraphs)
+            edited.append(index + 1)
+            changed.add(partname)
+
+        replacements = {
+            partname: etree.tostring(
+                trees[partname], xml_declaration=True, encoding="UTF-8", standalone=True
+            )
+            for partname in changed
+        }
+        _write_replaced(zf, path + ".tmp", lambda zin, info: replacements.get(info.filename))
+    os.replace(path + ".tmp", path)
+    return edited
@@ -0,0 +1,123 @@
+"""Render slide specs straight to one static HTML page with an SVG per slide.
+
+Nothing here touches python-pptx: the page is laid out from the textbox
+geometry slides.text_boxes() reads off the prototypes, in points on the same
+10" x 5.625" slide, and lines are broken by text_fit the way the overflow
+estimate breaks them. Speaker notes sit under each slide, hidden until the
+"Speaker notes" box at the top is ticked.
+"""
+
+from html import escape
+
+import text_fit
+
+# Where the first baseline sits below the top of a line, relative to the font
+# size: Calibri's line gap plus its ascent.
+BASELINE = 0.97
+
+ANCHORS = {"l": "start", "ctr": "middle", "r": "end"}
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ background: #{page}; color: #ddd; font-family: Calibri, Carlito, sans-serif;
+       margin: 0 auto; max-width: 960px; padding: 1em; }}
+label {{ display: block; margin-bottom: 1em; }}
+section {{ margin-bottom: 2em; }}
+svg {{ display: block; width: 100%; height: auto; }}
+svg text {{ font-family: Calibri, Carlito, sans-serif; white-space: pre; }}
+.notes {{ display: none; margin: 0.5em 0 0; white-space: pre-wrap; }}
+#show-notes:checked ~ section .notes {{ display: block; }}
+</style>
+</head>
+<body>
+<input type="checkbox" id="show-notes"><label for="show-notes">Speaker notes</label>
+{slides}
+</body>
+</html>
+"""
+
+
+def render_text(box, paragraphs, size):
+    """SVG ``text`` elements for one textbox's paragraphs at `size` points."""
+    face = text_fit.metrics(box["bold"])
+    width = box["width"] - 2 * text_fit.INSET_X
+    anchor = ANCHORS.get(box["align"], "start")
+    if anchor == "middle":
+        x = box["left"] + box["width"] / 2
+    elif anchor == "end":
+        x = box["left"] + box["width"] - text_fit.INSET_X
+    else:
+        x = box["left"] + text_fit.INSET_X
+    weight = ' font-weight="bold"' if box["bold"] else ""
+
+    elements = []
+    y = box["top"] + text_fit.INSET_Y + size * BASELINE
+    for i, paragraph in enumerate(paragraphs or [""]):
+        if i:
+            y += box["space_before"]
+        for line in face.wrap(paragraph, size, width):
+            if line:
+                elements.append(
+                    f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size:g}" '
+                    f'fill="#{box["color"]}" text-anchor="{anchor}"{weight}>'
+                    f"{escape(line)}</text>"
+                )
+            y += size * text_fit.LINE_HEIGHT
+    return elements
+
+
+def render_media(item):
+    """SVG for an image, or a video's poster, fitted into ``item["box"]``.
+
+    A video gets a play button, over a grey frame when it has no poster.
+    """
+    x, y, w, h = item["box"]
+    elements = []
+    image = item["poster"] if item["video"] else item["path"]
+    if image:
+        elements.append(
+            f'<image href="{escape(image)}" x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" '
+            f'height="{h:.1f}" preserveAspectRatio="xMidYMid meet"/>'
+        )
+    elif item["video"]:
+        elements.append(
+            f'<rect x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" height="{h:.1f}" fill="#535353"/>'
+        )
+    if item["video"]:
+        cx, cy, r = x + w / 2, y + h / 2, min(w, h) / 8
+        elements.append(
+            f'<a href="{escape(item["path"])}"><circle cx="{cx:.1f}" cy="{cy:.1f}" '
+            f'r="{r:.1f}" fill="#000" fill-opacity="0.6"/><path d="M{cx - r / 3:.1f} '
+            f'{cy - r / 2:.1f}v{r:.1f}l{r * 0.8:.1f} {-r / 2:.1f}z" fill="#fff"/></a>'
+        )
+    return elements
+
+
+def render_slide(boxes, texts, notes, width, height, background, sizes=(), media=None):
+    """One slide as a ``section`` holding its SVG and notes.
+
+    `sizes` optionally overrides the font size of each textbox, as autofit
+    does; None keeps the design size. `media` is a render_media() item.
+    """
+    elements = [f'<rect width="{width:g}" height="{height:g}" fill="#{background}"/>']
+    for index, (box, paragraphs) in enumerate(zip(boxes, texts)):
+        size = sizes[index] if index < len(sizes) and sizes[index] else box["size"]
+        elements.extend(render_text(box, paragraphs, size))
+    if media:
+        elements.extend(render_media(media))
+    return (
+        "<section>\n"
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width:g} {height:g}">\n'
+        + "\n".join(elements)
+        + "\n</svg>\n"
+        + (f'<p class="notes">{escape(notes)}</p>\n' if notes else "")
+        + "</section>"
+    )
+
+
+def render_page(rendered_slides, title, page="000000"):
+    return PAGE.format(title=escape(title), page=page, slides="\n".join(rendered_slides))
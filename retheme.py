@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Recolour finished decks by mapping their RGB colours, without rebuilding them.
+
+    uv run retheme.py --map 1DB954=E22134 --map 191919=000000 archive/ talk.pptx
+
+Every XML part under ppt/ (slides, notes, layouts, masters, the theme) is
+read one at a time and its ``srgbClr`` values are mapped; parts with nothing
+to change are copied through compressed, byte for byte, by
+opc.transform_package(). Directories are searched for .pptx files and the
+decks are processed in a process pool, in place or into --output-dir; two
+decks that would be written to the same file are refused up front. The
+palette of the generated decks is BLACK 191919, WHITE FFFFFF, GREEN 1DB954,
+GRAY B3B3B3 and DARK_GRAY 535353 (see slides.py).
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import opc
+
+COLOR = re.compile(rb'(srgbClr val=")([0-9A-Fa-f]{6})"')
+HEX = re.compile(r"[0-9A-Fa-f]{6}")
+
+
+def parse_mapping(pairs):
+    """``FROM=TO`` hex colour pairs as a mapping of upper-case bytes."""
+    mapping = {}
+    for pair in pairs:
+        old, _, new = pair.partition("=")
+        if not (HEX.fullmatch(old) and HEX.fullmatch(new)):
+            raise ValueError(f"expected RRGGBB=RRGGBB, got {pair!r}")
+        mapping[old.upper().encode()] = new.upper().encode()
+    return mapping
+
+
+def retheme(path, mapping, output=None):
+    """Map the colours of the deck at `path`, writing it to `output` (default: in place).
+
+    Returns the number of parts that changed.
+    """
+
+    def replace(zin, info):
+        if not (info.filename.startswith("ppt/") and info.filename.endswith(".xml")):
+            return None
+        xml = zin.read(info)
+        recoloured = COLOR.sub(
+            lambda m: m.group(1) + mapping.get(m.group(2).upper(), m.group(2)) + b'"', xml
+        )
+        return recoloured if recoloured != xml else None
+
+    if output:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    return opc.transform_package(path, replace, output)
+
+
+def find_decks(paths):
+    """``(deck, path relative to its argument)`` for files and decks under directories."""
+    decks = []
+    for path in paths:
+        if not os.path.isdir(path):
+            decks.append((path, os.path.basename(path)))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".pptx") and not name.startswith("~$"):
+                    deck = os.path.join(root, name)
+                    decks.append((deck, os.path.relpath(deck, path)))
+    return decks
+
+
+def _retheme(path, mapping, output):
+    # Runs in a worker process.
+    start = time.perf_counter()
+    return retheme(path, mapping, output), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="decks, or directories to search for them")
+    parser.add_argument(
+        "--map",
+        action="append",
+        required=True,
+        metavar="FROM=TO",
+        help="replace colour FROM with TO, both RRGGBB; repeatable",
+    )
+    parser.add_argument("--output-dir", help="write decks here instead of in place")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    try:
+        mapping = parse_mapping(args.map)
+    except ValueError as exc:
+        parser.error(str(exc))
+    decks = [
+        (deck, os.path.join(args.output_dir, name) if args.output_dir else deck)
+        for deck, name in find_decks(args.paths)
+    ]
+    # Two decks written to one file would overwrite each other, or race.
+    targets = {}
+    for deck, output in decks:
+        target = os.path.realpath(output)
+        if target in targets:
+            parser.error(f"{targets[target]} and {deck} would both be written to {output}")
+        targets[target] = deck
+
+    start = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(
+                _retheme,
+                deck,
+                mapping,
+                output if args.output_dir else None,
+            ): deck
+            for deck, output in decks
+        }
+        for future in as_completed(futures):
+            deck = futures[future]
+            try:
+                parts, elapsed = future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"FAILED {deck}: {type(exc).__name__}: {exc}", file=sys.stderr)
+                continue
+            print(f"Rethemed {deck}: {parts} parts in {elapsed * 1000:.0f} ms")
+
+    wall = time.perf_counter() - start
+    print(f"Rethemed {len(decks) - failed}/{len(decks)} decks in {wall:.2f}s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""Build decks over HTTP on a pool of warm worker processes.
+
+    uv run generate_slides.py --serve 8765
+    curl --data-binary @deck.json localhost:8765/build -o deck.pptx
+    curl localhost:8765/metrics
+
+``POST /build`` takes a JSON list of slide specs, or an object with
+``slides`` and optional ``styled`` and ``autofit`` flags, and answers with
+the pptx. Specs are validated with generate_slides.check_slides() first;
+errors come back as a 400 with the problems as JSON. Decks are saved with
+slides.save_reproducible(), so a result is fully determined by the request
+and its media files and is kept in an LRU cache keyed by a hash of both;
+concurrent requests for the same deck share one build. ``GET /metrics``
+reports queue depth, cache use and latency percentiles, ``GET /healthz``
+that the service is up.
+
+The workers import python-pptx and draw the slide prototypes when they
+start, so no request pays for that.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_slides import check_slides
+
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+MAX_BODY = 16 * 1024 * 1024
+
+# Latencies kept for the percentiles in /metrics.
+LATENCY_WINDOW = 1000
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+def _warm_worker():
+    import slides
+
+    slides._build_prototypes()
+    slides.new_presentation()
+
+
+def _build(specs, styled, autofit):
+    # Runs in a worker process.
+    import slides
+
+    start = time.perf_counter()
+    prs = slides.build_presentation(specs, autofit=autofit, styled=styled)
+    out = io.BytesIO()
+    slides.save_reproducible(prs, out)
+    return out.getvalue(), time.perf_counter() - start
+
+
+def _request_key(specs, styled, autofit):
+    # The request's hash, taking in the content of every media file as
+    # slides.slide_digest() does, so an image replaced on disk is rebuilt.
+    h = hashlib.sha256(json.dumps([specs, styled, autofit], sort_keys=True).encode())
+    for spec in specs:
+        item = spec.get("media")
+        if not item:
+            continue
+        paths = [item] if isinstance(item, str) else [item.get("path"), item.get("poster")]
+        for path in paths:
+            if path:
+                with open(path, "rb") as f:
+                    h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+class LRUCache:
+    """Built decks by request hash, evicting the least recently used past `max_bytes`."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        blob = self._entries.get(key)
+        if blob is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return blob
+
+    def put(self, key, blob):
+        if len(blob) > self.max_bytes:
+            return
+        if key in self._entries:
+            self.bytes -= len(self._entries.pop(key))
+        self._entries[key] = blob
+        self.bytes += len(blob)
+        while self.bytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.bytes -= len(old)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _percentiles(values):
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def at(q):
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": at(0.5),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+class DeckService:
+    """The /build, /metrics and /healthz handlers and the state behind them."""
+
+    def __init__(self, workers=None, cache_bytes=256 * 1024 * 1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_warm_worker)
+        self.cache = LRUCache(cache_bytes)
+        self.building = {}
+        self.requests = 0
+        self.errors = 0
+        self.request_latency = deque(maxlen=LATENCY_WINDOW)
+        self.build_latency = deque(maxlen=LATENCY_WINDOW)
+
+    def warm(self):
+        """Start every worker now rather than on the first requests."""
+        for future in [self.pool.submit(_warm_worker) for _ in range(self.workers)]:
+            future.result()
+
+    def metrics(self):
+        builds = len(self.building)
+        return {
+            "workers": self.workers,
+            "builds_in_flight": builds,
+            "queue_depth": max(builds - self.workers, 0),
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache": {
+                "entries": len(self.cache),
+                "bytes": self.cache.bytes,
+                "max_bytes": self.cache.max_bytes,
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+            },
+            "request_latency": _percentiles(self.request_latency),
+            "build_latency": _percentiles(self.build_latency),
+        }
+
+    async def build(self, request):
+        """Return ``(status, content type, body, headers)`` for a /build body."""
+        try:
+            request = json.loads(request)
+        except ValueError as exc:
+            return 400, "application/json", _json({"error": f"invalid JSON: {exc}"}), {}
+        if isinstance(request, list):
+            request = {"slides": request}
+        if not isinstance(request, dict) or not isinstance(request.get("slides"), list):
+            error = "expected a list of slide specs or an object with 'slides'"
+            return 400, "application/json", _json({"error": error}), {}
+        specs = request["slides"]
+        styled = bool(request.get("styled"))
+        autofit = bool(request.get("autofit"))
+        errors = [
+            {"slide": index + 1, "message": message}
+            for index, level, message in check_slides(specs)
+            if level == "error"
+        ]
+        if errors:
+            return 400, "application/json", _json({"errors": errors}), {}
+
+        loop = asyncio.get_running_loop()
+        try:
+            key = await loop.run_in_executor(None, _request_key, specs, styled, autofit)
+        except OSError as exc:
+            return 400, "application/json", _json({"error": str(exc)}), {}
+        blob = self.cache.get(key)
+        if blob is not None:
+            return 200, PPTX_TYPE, blob, {"X-Cache": "hit"}
+
+        task = self.building.get(key)
+        if task is None:
+            task = self.building[key] = asyncio.ensure_future(
+                self._build_and_cache(key, specs, styled, autofit)
+            )
+        blob, seconds = await asyncio.shield(task)
+        return 200, PPTX_TYPE, blob, {"X-Cache": "miss", "X-Build-Ms": f"{seconds * 1000:.0f}"}
+
+    async def _build_and_cache(self, key, specs, styled, autofit):
+        loop = asyncio.get_running_loop()
+        try:
+            blob, seconds = await loop.run_in_executor(self.pool, _build, specs, styled, autofit)
+        finally:
+            del self.building[key]
+        self.build_latency.append(seconds)
+        self.cache.put(key, blob)
+        return blob, seconds
+
+    async def respond(self, method, path, body):
+        if path == "/build":
+            if method != "POST":
+                return 405, "text/plain", b"POST a deck spec\n", {}
+            return await self.build(body)
+        if path == "/metrics" and method == "GET":
+            return 200, "application/json", _json(self.metrics()), {}
+        if path == "/healthz" and method == "GET":
+            return 200, "text/plain", b"ok\n", {}
+        return 404, "text/plain", b"not found\n", {}
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it closes."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split(None, 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    status, content_type, body, extra = 413, "text/plain", b"too large\n", {}
+                    keep_alive = False
+                else:
+                    data = await reader.readexactly(length)
+                    try:
+                        status, content_type, body, extra = await self.respond(
+                            method, path.split("?")[0], data
+                        )
+                    except Exception as exc:
+                        status, content_type, extra = 500, "application/json", {}
+                        body = _json({"error": f"{type(exc).__name__}: {exc}"})
+                    keep_alive = (
+                        headers.get("connection", "").lower() != "close"
+                        and version.strip() == "HTTP/1.1"
+                    )
+
+                self.requests += 1
+                self.errors += status >= 400
+                if path.startswith("/build"):
+                    self.request_latency.append(time.perf_counter() - start)
+                head = [
+                    f"HTTP/1.1 {status} {REASONS[status]}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(body)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ] + [f"{name}: {value}" for name, value in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _json(value):
+    return json.dumps(value, indent=1).encode() + b"\n"
+
+
+async def _serve(host, port, workers, cache_bytes):
+    service = DeckService(workers, cache_bytes)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, service.warm)
+    server = await asyncio.start_server(service.handle, host, port)
+    address = server.sockets[0].getsockname()
+    print(
+        f"Serving decks on http://{address[0]}:{address[1]} with {service.workers} workers",
+        flush=True,
+    )
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.pool.shutdown(cancel_futures=True)
+
+
+def serve(port, host="127.0.0.1", workers=None, cache_mb=256):
+    """Run the service until interrupted; port 0 picks a free port."""
+    try:
+        asyncio.run(_serve(host, port, workers, cache_mb * 1024 * 1024))
+    except KeyboardInterrupt:
+        pass
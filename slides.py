@@ -0,0 +1,1038 @@
+"""Slide builders for the talk decks, on top of python-pptx.
+
+Importing this module pulls in python-pptx and lxml; generate_slides.py only
+does so once it actually builds a deck.
+"""
+
+import datetime
+import hashlib
+import inspect
+import io
+import itertools
+import json
+import os
+import resource
+import sys
+import time
+import weakref
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from copy import deepcopy
+
+from lxml import etree
+from pptx import Presentation
+from pptx.util import Inches, Pt, Emu
+from pptx.enum.text import PP_ALIGN
+from pptx.dml.color import RGBColor
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.package import XmlPart
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI, PackURI
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.oxml.ns import qn
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.parts.image import Image, ImagePart
+from pptx.parts.slide import NotesSlidePart, SlideLayoutPart, SlidePart
+
+import media
+import opc
+import preview
+import text_fit
+
+# Spotify brand-ish colors
+BLACK = RGBColor(0x19, 0x19, 0x19)
+WHITE = RGBColor(0xFF, 0xFF, 0xFF)
+GREEN = RGBColor(0x1D, 0xB9, 0x54)
+GRAY = RGBColor(0xB3, 0xB3, 0xB3)
+DARK_GRAY = RGBColor(0x53, 0x53, 0x53)
+
+
+def set_slide_bg(slide, color):
+    background = slide.background
+    fill = background.fill
+    fill.solid()
+    fill.fore_color.rgb = color
+
+
+SLIDE_WIDTH = Inches(10)
+SLIDE_HEIGHT = Inches(5.625)  # 16:9
+
+
+def new_presentation(styled=False):
+    prs = Presentation()
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
+    if styled:
+        add_styled_layouts(prs)
+    return prs
+
+
+def _draw_title_slide(slide):
+    # Title
+    left = Inches(1)
+    top = Inches(2.0)
+    width = Inches(8)
+    height = Inches(1.5)
+    txBox = slide.shapes.add_textbox(left, top, width, height)
+    tf = txBox.text_frame
+    tf.word_wrap = True
+    p = tf.paragraphs[0]
+    p.font.size = Pt(40)
+    p.font.bold = True
+    p.font.color.rgb = GREEN
+    p.alignment = PP_ALIGN.CENTER
+
+    # Subtitle
+    top2 = Inches(3.6)
+    txBox2 = slide.shapes.add_textbox(left, top2, width, Inches(1.5))
+    tf2 = txBox2.text_frame
+    tf2.word_wrap = True
+    p2 = tf2.paragraphs[0]
+    p2.font.size = Pt(22)
+    p2.font.color.rgb = GRAY
+    p2.alignment = PP_ALIGN.CENTER
+
+
+def _draw_content_slide(slide):
+    # Title
+    left = Inches(0.8)
+    top = Inches(0.5)
+    width = Inches(8.4)
+    txBox = slide.shapes.add_textbox(left, top, width, Inches(1.0))
+    tf = txBox.text_frame
+    tf.word_wrap = True
+    p = tf.paragraphs[0]
+    p.font.size = Pt(32)
+    p.font.bold = True
+    p.font.color.rgb = GREEN
+
+    # Bullets: the first paragraph, then the one every following bullet copies
+    top2 = Inches(1.7)
+    txBox2 = slide.shapes.add_textbox(left, top2, width, Inches(5.0))
+    tf2 = txBox2.text_frame
+    tf2.word_wrap = True
+    for p in (tf2.paragraphs[0], tf2.add_paragraph()):
+        p.font.size = Pt(22)
+        p.font.color.rgb = WHITE
+        p.level = 0
+    p.space_before = Pt(12)
+
+
+def _draw_section_slide(slide):
+    top = Inches(2.5)
+    left = Inches(1)
+    width = Inches(8)
+    txBox = slide.shapes.add_textbox(left, top, width, Inches(1.5))
+    tf = txBox.text_frame
+    tf.word_wrap = True
+    p = tf.paragraphs[0]
+    p.font.size = Pt(38)
+    p.font.bold = True
+    p.font.color.rgb = GREEN
+    p.alignment = PP_ALIGN.CENTER
+
+    top2 = Inches(3.8)
+    txBox2 = slide.shapes.add_textbox(left, top2, width, Inches(1.0))
+    tf2 = txBox2.text_frame
+    tf2.word_wrap = True
+    p2 = tf2.paragraphs[0]
+    p2.font.size = Pt(22)
+    p2.font.color.rgb = GRAY
+    p2.alignment = PP_ALIGN.CENTER
+
+
+def _draw_end_slide(slide):
+    left = Inches(1)
+    top = Inches(1.5)
+    width = Inches(8)
+    txBox = slide.shapes.add_textbox(left, top, width, Inches(1.2))
+    tf = txBox.text_frame
+    tf.word_wrap = True
+    p = tf.paragraphs[0]
+    p.font.size = Pt(38)
+    p.font.bold = True
+    p.font.color.rgb = GREEN
+    p.alignment = PP_ALIGN.CENTER
+
+    top2 = Inches(3.0)
+    txBox2 = slide.shapes.add_textbox(left, top2, width, Inches(3.5))
+    tf2 = txBox2.text_frame
+    tf2.word_wrap = True
+    for p in (tf2.paragraphs[0], tf2.add_paragraph()):
+        p.font.size = Pt(20)
+        p.font.color.rgb = GRAY
+        p.alignment = PP_ALIGN.CENTER
+    p.space_before = Pt(8)
+
+
+PROTOTYPE_DRAWERS = {
+    "title": _draw_title_slide,
+    "content": _draw_content_slide,
+    "section": _draw_section_slide,
+    "end": _draw_end_slide,
+}
+
+_prototypes = {}
+
+
+def _build_prototypes():
+    """Draw every slide kind once, empty, and keep its background and shapes.
+
+    Each shape is stored without its paragraphs, next to the formatted ``a:p``
+    templates it had: the first one is used for the first paragraph, the last
+    one for every paragraph after it.
+    """
+    prs = new_presentation()
+    for kind, draw in PROTOTYPE_DRAWERS.items():
+        slide = prs.slides.add_slide(prs.slide_layouts[6])  # blank
+        set_slide_bg(slide, BLACK)
+        draw(slide)
+        shapes = []
+        for shape in slide.shapes:
+            sp = shape._element
+            txBody = sp.txBody
+            templates = txBody.findall(qn("a:p"))
+            for p in templates:
+                txBody.remove(p)
+            shapes.append((sp, templates))
+        _prototypes[kind] = (slide._element.cSld.bg, shapes)
+
+
+def _fill(txBody, templates, paragraphs):
+    for i, text in enumerate(paragraphs or [""]):
+        p = deepcopy(templates[min(i, len(templates) - 1)])
+        p.append_text(text)
+        txBody.append(p)
+
+
+# Per presentation part: the p:sldId appended last, and the slide id and
+# partname number the next slide gets. They hold while that p:sldId is still
+# the last one in the list.
+_slide_counters = weakref.WeakKeyDictionary()
+
+
+def append_slides(prs, layout, count):
+    """Append `count` slides on `layout` to `prs` and return them.
+
+    ``prs.slides.add_slide()`` scans every slide id and every relationship of
+    the presentation for each slide it adds, which makes a long deck
+    quadratic to build. Here ids, partnames and relationship ids are
+    reserved from counters kept per presentation, so each slide costs the
+    same however many came before it. The deck is rescanned only when its
+    slide list was changed by something else in between.
+    """
+    part = prs.part
+    sldIdLst = part._element.get_or_add_sldIdLst()
+    last, next_id, first = _slide_counters.get(part, (None, None, None))
+    if last is None or last.getparent() is not sldIdLst or last.getnext() is not None:
+        ids = [int(sldId.get("id")) for sldId in sldIdLst]
+        next_id, first = max(ids, default=255) + 1, len(ids) + 1
+
+    slides = []
+    for number in range(first, first + count):
+        slide_part = SlidePart.new(
+            PackURI(f"/ppt/slides/slide{number}.xml"), part.package, layout.part
+        )
+        # A new part can't be related already: skip relate_to()'s search.
+        rId = part._rels._add_relationship(RT.SLIDE, slide_part)
+        last = sldIdLst._add_sldId(id=next_id, rId=rId)
+        next_id += 1
+        slide = slide_part.slide
+        slide.shapes.clone_layout_placeholders(layout)
+        slides.append(slide)
+    if last is not None:
+        _slide_counters[part] = (last, next_id, first + count)
+    return slides
+
+
+def stamp_slide(prs, kind, texts, notes=""):
+    """Add a `kind` slide as a copy of its prototype.
+
+    `texts` holds one list of paragraph strings per textbox, in drawing order;
+    textboxes past the end of `texts` are left out. In a presentation set up
+    by add_styled_layouts() the text goes into the placeholders of the kind's
+    layout instead, which carry all of the formatting.
+    """
+    if not _prototypes:
+        _build_prototypes()
+
+    layout = prs.slide_layouts.get_by_name(STYLED_LAYOUT_NAME.format(kind=kind))
+    if layout is not None:
+        slide = append_slides(prs, layout, 1)[0]
+        spTree = slide._element.cSld.spTree
+        placeholders = list(spTree.iter(qn("p:sp")))
+        for sp, templates, paragraphs in itertools.zip_longest(
+            placeholders, _styled_templates[kind], texts
+        ):
+            if paragraphs is None:
+                spTree.remove(sp)
+                continue
+            txBody = sp.get_or_add_txBody()
+            for p in txBody.findall(qn("a:p")):
+                txBody.remove(p)
+            _fill(txBody, templates, paragraphs)
+    else:
+        bg, shapes = _prototypes[kind]
+        slide = append_slides(prs, prs.slide_layouts[6], 1)[0]  # blank
+        cSld = slide._element.cSld
+        cSld.insert(0, deepcopy(bg))
+        for (shape, templates), paragraphs in zip(shapes, texts):
+            sp = deepcopy(shape)
+            _fill(sp.txBody, templates, paragraphs)
+            cSld.spTree.append(sp)
+
+    if notes:
+        slide.notes_slide.notes_text_frame.text = notes
+
+    return slide
+
+
+STYLED_LAYOUT_NAME = "Talk {kind}"
+
+# Per kind and placeholder, the paragraph templates of styled slides: an empty
+# paragraph, after a first one that cancels the layout's space-before where
+# only later paragraphs should get it.
+_styled_templates = {}
+
+
+def _layout_placeholder(sp, templates, index, shape_id):
+    """Turn a prototype textbox into a layout placeholder with its formatting.
+
+    The text style of the textbox's later paragraphs becomes the
+    placeholder's level-1 style, overriding what the master's title and body
+    styles would otherwise add: bullets, indents, centring and a heading font.
+    """
+    ph = deepcopy(sp)
+    nvSpPr = ph.nvSpPr
+    nvSpPr.cNvPr.set("id", str(shape_id))
+    nvSpPr.cNvPr.set("name", "Title 1" if index == 0 else f"Text Placeholder {index + 1}")
+    del nvSpPr.cNvSpPr.attrib["txBox"]
+    etree.SubElement(nvSpPr.cNvSpPr, qn("a:spLocks"), noGrp="1")
+    if index == 0:
+        etree.SubElement(nvSpPr.nvPr, qn("p:ph"), type="title")
+    else:
+        etree.SubElement(nvSpPr.nvPr, qn("p:ph"), type="body", idx=str(index))
+
+    txBody = ph.txBody
+    txBody.bodyPr.set("anchor", "t")
+    lvl1pPr = deepcopy(templates[-1].find(qn("a:pPr")))
+    lvl1pPr.tag = qn("a:lvl1pPr")
+    lvl1pPr.set("marL", "0")
+    lvl1pPr.set("indent", "0")
+    lvl1pPr.set("algn", lvl1pPr.get("algn", "l"))
+    if lvl1pPr.find(qn("a:spcBef")) is None:
+        spcBef = OxmlElement("a:spcBef")
+        etree.SubElement(spcBef, qn("a:spcPts"), val="0")
+        lvl1pPr.insert(0, spcBef)
+    defRPr = lvl1pPr.find(qn("a:defRPr"))
+    defRPr.addprevious(OxmlElement("a:buNone"))
+    defRPr.set("b", defRPr.get("b", "0"))
+    etree.SubElement(defRPr, qn("a:latin"), typeface="+mn-lt")
+    txBody.find(qn("a:lstStyle")).append(lvl1pPr)
+    etree.SubElement(txBody, qn("a:p"))
+    return ph
+
+
+def add_styled_layouts(prs):
+    """Move the talk's formatting out of the slides into the master and layouts.
+
+    The master gets the BLACK background, and every slide kind a layout whose
+    placeholders have the position, size, colour, weight, alignment and
+    spacing of its textboxes. stamp_slide() then writes slides that carry
+    nothing but their text.
+    """
+    if not _prototypes:
+        _build_prototypes()
+    master = prs.slide_master
+    set_slide_bg(master, BLACK)
+    package = prs.part.package
+    blank = prs.slide_layouts[6]
+    sldLayoutIdLst = master._element.get_or_add_sldLayoutIdLst()
+    ids = [int(e.get("id")) for e in sldLayoutIdLst]
+    ids += [int(e.get("id")) for e in prs.part._element.iter(qn("p:sldMasterId"))]
+    next_id = max(ids) + 1
+
+    for kind, (bg, shapes) in _prototypes.items():
+        layout = deepcopy(blank._element)
+        del layout.attrib["type"]
+        layout.cSld.set("name", STYLED_LAYOUT_NAME.format(kind=kind))
+        spTree = layout.cSld.spTree
+        shape_id = max(int(e.get("id")) for e in spTree.iter(qn("p:cNvPr"))) + 1
+        _styled_templates[kind] = []
+        for index, (sp, templates) in enumerate(shapes):
+            spTree.append(_layout_placeholder(sp, templates, index, shape_id + index))
+            first = OxmlElement("a:p")
+            later_spcBef = templates[-1].find(f"{qn('a:pPr')}/{qn('a:spcBef')}")
+            if len(templates) > 1 and later_spcBef is not None:
+                spcBef = etree.SubElement(first.get_or_add_pPr(), qn("a:spcBef"))
+                etree.SubElement(spcBef, qn("a:spcPts"), val="0")
+            _styled_templates[kind].append([first, OxmlElement("a:p")])
+
+        part = SlideLayoutPart(
+            package.next_partname("/ppt/slideLayouts/slideLayout%d.xml"),
+            CT.PML_SLIDE_LAYOUT,
+            package,
+            layout,
+        )
+        part.relate_to(master.part, RT.SLIDE_MASTER)
+        rId = master.part.relate_to(part, RT.SLIDE_LAYOUT)
+        etree.SubElement(
+            sldLayoutIdLst, qn("p:sldLayoutId"), {"id": str(next_id), qn("r:id"): rId}
+        )
+        next_id += 1
+
+
+def add_title_slide(prs, title, subtitle, notes=""):
+    return stamp_slide(prs, "title", [[title], [subtitle]], notes)
+
+
+def add_content_slide(prs, title, bullets, notes="", media=None):
+    slide = stamp_slide(prs, "content", [[title], bullets], notes)
+    if media:
+        body = slide.shapes[1]
+        # A styled slide's placeholder inherits its position from the layout;
+        # a transform must give all of it, not just the narrower width.
+        body.left, body.top, body.height = body.left, body.top, body.height
+        body.width = MEDIA_TEXT_WIDTH
+        add_media(slide, media)
+    return slide
+
+
+def add_section_slide(prs, title, subtitle="", notes=""):
+    texts = [[title], [subtitle]] if subtitle else [[title]]
+    return stamp_slide(prs, "section", texts, notes)
+
+
+def add_end_slide(prs, title, lines, notes=""):
+    return stamp_slide(prs, "end", [[title], lines], notes)
+
+
+# Where a content slide's image or video goes, to the right of its bullets,
+# and how wide the bullets are then.
+MEDIA_BOX = (Inches(5.2), Inches(1.7), Inches(4.0), Inches(3.5))
+MEDIA_TEXT_WIDTH = Inches(4.2)
+
+# Image parts per package by SHA1, so adding a picture doesn't search every
+# part for an identical one the way python-pptx does.
+_image_parts = weakref.WeakKeyDictionary()
+
+
+def media_item(value):
+    """Normalise a spec's ``media``, a path or ``{"path": ..., "poster": ...}``."""
+    if isinstance(value, str):
+        return {"path": value, "poster": None}
+    return {"path": value["path"], "poster": value.get("poster")}
+
+
+def _media_pixels():
+    return tuple(int(Emu(length).inches * media.MEDIA_DPI) for length in MEDIA_BOX[2:])
+
+
+def media_jobs(slides):
+    """media.prepare_images() jobs for every image and poster in the slide specs."""
+    width, height = _media_pixels()
+    jobs = {}
+    for spec in slides:
+        if spec.get("media"):
+            item = media_item(spec["media"])
+            for path in (item["poster"], None if media.is_video(item["path"]) else item["path"]):
+                if path:
+                    jobs[path] = (path, width, height)
+    return list(jobs.values())
+
+
+def fit_box(box, size):
+    """Largest rectangle with the aspect ratio of `size` centred in `box`."""
+    left, top, width, height = box
+    scale = min(width / size[0], height / size[1])
+    fit_width, fit_height = int(size[0] * scale), int(size[1] * scale)
+    return (
+        Emu(left + (width - fit_width) // 2),
+        Emu(top + (height - fit_height) // 2),
+        Emu(fit_width),
+        Emu(fit_height),
+    )
+
+
+def add_picture(slide, path, box):
+    """Add the image at `path`, fitted into `box`, storing it once per package."""
+    package = slide.part.package
+    with open(path, "rb") as f:
+        image = Image.from_blob(f.read(), os.path.basename(path))
+    parts = _image_parts.setdefault(package, {})
+    image_part = parts.get(image.sha1)
+    if image_part is None:
+        image_part = parts[image.sha1] = ImagePart.new(package, image)
+    rId = slide.part.relate_to(image_part, RT.IMAGE)
+    pic = slide.shapes._add_pic_from_image_part(image_part, rId, *fit_box(box, image.size))
+    return slide.shapes._shape_factory(pic)
+
+
+def add_media(slide, value, box=MEDIA_BOX):
+    """Add a spec's image or video (with optional poster image) to `slide`."""
+    item = media_item(value)
+    width, height = _media_pixels()
+    poster = item["poster"] and media.prepare_image(item["poster"], width, height)
+    if not media.is_video(item["path"]):
+        return add_picture(slide, media.prepare_image(item["path"], width, height), box)
+    size = media.image_size(poster) if poster else (16, 9)
+    mime_type = media.VIDEO_TYPES[os.path.splitext(item["path"])[1].lower()]
+    return slide.shapes.add_movie(
+        item["path"], *fit_box(box, size), poster_frame_image=poster, mime_type=mime_type
+    )
+
+
+def slide_texts(spec):
+    """The paragraphs of each textbox of a slide spec, as stamp_slide() takes them."""
+    kind = spec["builder"]
+    if kind == "content":
+        return [[spec["title"]], spec["bullets"]]
+    if kind == "end":
+        return [[spec["title"]], spec["lines"]]
+    if spec.get("subtitle"):
+        return [[spec["title"]], [spec["subtitle"]]]
+    return [[spec["title"]]]
+
+
+def text_boxes(kind):
+    """Position and type of each textbox on a `kind` slide, in points.
+
+    Read off the prototype: ``left``, ``top``, ``width`` and ``height`` of the
+    box, the ``size``, ``bold``, ``color`` (hex RGB) and ``align`` ("l", "ctr"
+    or "r") of its text and the ``space_before`` paragraphs after the first get.
+    """
+    if not _prototypes:
+        _build_prototypes()
+    boxes = []
+    for sp, templates in _prototypes[kind][1]:
+        pPr = templates[0].find(qn("a:pPr"))
+        defRPr = pPr.find(qn("a:defRPr"))
+        spcPts = templates[-1].find(f"{qn('a:pPr')}/{qn('a:spcBef')}/{qn('a:spcPts')}")
+        boxes.append(
+            {
+                "left": Emu(sp.x).pt,
+                "top": Emu(sp.y).pt,
+                "width": Emu(sp.cx).pt,
+                "height": Emu(sp.cy).pt,
+                "size": int(defRPr.get("sz")) / 100,
+                "bold": defRPr.get("b") == "1",
+                "color": defRPr.find(f"{qn('a:solidFill')}/{qn('a:srgbClr')}").get("val"),
+                "align": pPr.get("algn", "l"),
+                "space_before": int(spcPts.get("val")) / 100 if spcPts is not None else 0.0,
+            }
+        )
+    return boxes
+
+
+def measure_slides(slides):
+    """text_fit.measure() results for every slide spec, in one pass over the deck."""
+    boxes = {kind: text_boxes(kind) for kind in PROTOTYPE_DRAWERS}
+    return [_measure(boxes, spec) for spec in slides]
+
+
+def _measure(boxes, spec):
+    return text_fit.measure(slide_boxes(boxes, spec), slide_texts(spec), SLIDE_HEIGHT.pt)
+
+
+def slide_boxes(boxes, spec):
+    """The text_boxes() of the spec's kind, with the bullets narrowed for media."""
+    kind_boxes = boxes[spec["builder"]]
+    if spec.get("media"):
+        kind_boxes = list(kind_boxes)
+        kind_boxes[1] = dict(kind_boxes[1], width=MEDIA_TEXT_WIDTH.pt)
+    return kind_boxes
+
+
+def write_preview(slides, path, autofit=False, title="Talk preview"):
+    """Write the slide specs to `path` as an HTML page with an SVG per slide.
+
+    Uses the prototypes' geometry and colours but builds no presentation, so
+    nothing is serialised. With `autofit`, text is set at the sizes
+    build_presentation() would use. Media is linked, relative to `path`.
+    """
+    boxes = {kind: text_boxes(kind) for kind in PROTOTYPE_DRAWERS}
+    fits = measure_slides(slides) if autofit else [()] * len(slides)
+    directory = os.path.dirname(os.path.abspath(path))
+    media_box = [Emu(length).pt for length in MEDIA_BOX]
+    rendered = []
+    for spec, fit in zip(slides, fits):
+        item = media_item(spec["media"]) if spec.get("media") else None
+        if item:
+            item = {
+                key: value and os.path.relpath(os.path.abspath(value), directory)
+                for key, value in item.items()
+            }
+            item["video"] = media.is_video(item["path"])
+        rendered.append(
+            preview.render_slide(
+                slide_boxes(boxes, spec),
+                slide_texts(spec),
+                spec.get("notes", ""),
+                SLIDE_WIDTH.pt,
+                SLIDE_HEIGHT.pt,
+                str(BLACK),
+                [box["fit_size"] for box in fit],
+                item and dict(item, box=media_box),
+            )
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(preview.render_page(rendered, title))
+
+
+def set_font_size(slide, index, size):
+    """Set every paragraph of the slide's `index`-th textbox to `size` points."""
+    sp = slide.shapes[index]._element
+    for p in sp.txBody.iter(qn("a:p")):
+        p.get_or_add_pPr().get_or_add_defRPr().set("sz", str(int(size * 100)))
+
+
+BUILDERS = {
+    "title": add_title_slide,
+    "content": add_content_slide,
+    "section": add_section_slide,
+    "end": add_end_slide,
+}
+
+
+def add_notes(prs, slide_notes):
+    """Give each slide in `slide_notes`, ``(slide, text)`` pairs, its speaker notes.
+
+    ``slide.notes_slide`` clones the notes master's placeholders for every
+    slide and scans all package parts to number the new part, which makes a
+    deck's notes quadratic in its length. Here the first new notes slide is
+    made that way and copied, empty, for the rest, which are numbered from a
+    single scan. Slides that already have notes get their text replaced.
+    """
+    package = prs.part.package
+    master_part = prs.part.notes_master_part
+    prefix = "/ppt/notesSlides/notesSlide"
+    used = {part.partname for part in package.iter_parts() if part.partname.startswith(prefix)}
+    numbers = (n for n in itertools.count(1) if f"{prefix}{n}.xml" not in used)
+    template = None
+    for slide, text in slide_notes:
+        if slide.has_notes_slide:
+            notes_slide = slide.notes_slide
+        elif template is None:
+            notes_slide = slide.notes_slide
+            used.add(notes_slide.part.partname)
+            template = deepcopy(notes_slide._element)
+        else:
+            part = NotesSlidePart(
+                PackURI(f"{prefix}{next(numbers)}.xml"),
+                CT.PML_NOTES_SLIDE,
+                package,
+                deepcopy(template),
+            )
+            part.relate_to(master_part, RT.NOTES_MASTER)
+            part.relate_to(slide.part, RT.SLIDE)
+            slide.part.relate_to(part, RT.NOTES_SLIDE)
+            notes_slide = part.notes_slide
+        notes_slide.notes_text_frame.text = text
+
+
+def build_presentation(slides, tracer=None, autofit=False, styled=False):
+    """Build a presentation from slide specs like the ones in TALK.
+
+    `slides` may also be an iterator, such as md_deck.read_deck(), whose
+    slides are built as they arrive; a list has its images prepared in
+    parallel up front. With a tracing.StageTracer, the template load and
+    every builder call are recorded as separate stages, and all notes
+    slides as one. With `autofit`, text that would run off its slide is set
+    at the largest size that fits. With `styled`, formatting lives in
+    generated layouts, see add_styled_layouts().
+    """
+    stage = tracer.stage if tracer else lambda name, category: nullcontext()
+    with stage("Presentation()", "template"):
+        prs = new_presentation(styled)
+    boxes = {kind: text_boxes(kind) for kind in PROTOTYPE_DRAWERS} if autofit else None
+    jobs = media_jobs(slides) if isinstance(slides, (list, tuple)) else []
+    if jobs:
+        with stage("prepare images", "media"):
+            media.prepare_images(jobs)
+    slide_notes = []
+    for spec in slides:
+        fit = _measure(boxes, spec) if autofit else ()
+        kwargs = dict(spec)
+        kind = kwargs.pop("builder")
+        notes = kwargs.pop("notes", "")
+        with stage(kind, "builder"):
+            slide = BUILDERS[kind](prs, **kwargs)
+            for index, box in enumerate(fit):
+                if box["overflow"]:
+                    set_font_size(slide, index, box["fit_size"])
+        if notes:
+            slide_notes.append((slide, notes))
+    with stage("notes", "notes"):
+        add_notes(prs, slide_notes)
+    return prs
+
+
+def _release(part):
+    # Drop a written part's XML tree or blob and everything cached from it;
+    # keep what other parts' .rels still need to point at it.
+    for name in list(vars(part)):
+        if name not in ("_partname", "_content_type", "_package", "_rels"):
+            del vars(part)[name]
+
+
+def _zip_info(name, date_time, compress_level=None):
+    info = zipfile.ZipInfo(name, date_time or time.localtime()[:6])
+    if compress_level == 0:
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info._compresslevel = compress_level  # compress_level from Python 3.13
+    info.create_system = 3  # the default depends on the platform building the deck
+    info.external_attr = 0o600 << 16
+    return info
+
+
+# Members at least this big are deflated on a thread pool while the parts
+# after them are serialised; zlib releases the GIL as it works. At most
+# SAVE_IN_FLIGHT of them are compressing at once before the save waits.
+PARALLEL_COMPRESS_BYTES = 64 * 1024
+SAVE_IN_FLIGHT = 2 * (os.cpu_count() or 1)
+
+
+def _deflate(data, compress_level):
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION if compress_level is None else compress_level,
+        zlib.DEFLATED,
+        -15,
+    )
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data)
+
+
+def _members(prs, parts, release):
+    # (member name, content) of every zip member in order, optionally
+    # releasing each part once serialised.
+    package = prs.part.package
+    yield CONTENT_TYPES_URI.membername, serialize_part_xml(_ContentTypesItem.xml_for(parts))
+    yield PACKAGE_URI.rels_uri.membername, package._rels.xml
+    for part in parts:
+        if isinstance(part, XmlPart):
+            yield part.partname.membername, serialize_part_xml(part._element)
+        else:
+            yield part.partname.membername, part.blob
+        if part._rels:
+            yield part.partname.rels_uri.membername, part.rels.xml
+        if release:
+            _release(part)
+
+
+def _write_member(zf, info, data, compressed):
+    if compressed is None:
+        zf.writestr(info, data)
+    else:
+        opc.write_compressed(zf, info, *compressed.result(), len(data))
+
+
+def _write_package(prs, file, date_time=None, release=False, compress_level=None):
+    # Write every part into its zip member, in order, optionally releasing
+    # each once serialised; large members are compressed in parallel. Each
+    # member is written as soon as it and every member before it are ready,
+    # so a stream gets output as the save goes. With a fixed date_time,
+    # members are also sorted by name so the order doesn't depend on how
+    # the parts were related.
+    parts = list(prs.part.package.iter_parts())
+    if date_time:
+        parts.sort(key=lambda part: part.partname)
+    waiting = deque()
+    in_flight = 0
+    with zipfile.ZipFile(file, "w") as zf, ThreadPoolExecutor() as pool:
+        for name, data in _members(prs, parts, release):
+            compressed = None
+            if compress_level != 0 and len(data) >= PARALLEL_COMPRESS_BYTES:
+                compressed = pool.submit(_deflate, data, compress_level)
+                in_flight += 1
+            waiting.append((_zip_info(name, date_time, compress_level), data, compressed))
+            while waiting:
+                compressed = waiting[0][2]
+                if compressed is not None and in_flight <= SAVE_IN_FLIGHT:
+                    if not compressed.done():
+                        break
+                _write_member(zf, *waiting.popleft())
+                if compressed is not None:
+                    in_flight -= 1
+        while waiting:
+            _write_member(zf, *waiting.popleft())
+
+
+def save(prs, file, compress_level=None):
+    """Save `prs` like ``prs.save()``, compressing large parts in parallel.
+
+    `compress_level` is the deflate level, 1 to 9, or 0 to store parts
+    uncompressed for the fastest save; the default is zlib's, as python-pptx
+    uses.
+    """
+    _write_package(prs, file, compress_level=compress_level)
+
+
+def save_streaming(prs, file, timestamp=None, compress_level=None):
+    """Save `prs` to a path or binary stream one package part at a time.
+
+    Each part is released once serialised, and written out soon after, so
+    the object model shrinks while the file grows. This consumes `prs`: it
+    cannot be used or saved again afterwards. `file` may be unseekable, such
+    as stdout. A `timestamp` makes the output reproducible, as with
+    save_reproducible(); `compress_level` is as for save().
+    """
+    date_time = None
+    if timestamp is not None:
+        date_time = pin_properties(prs, timestamp)
+    _write_package(prs, file, date_time, release=True, compress_level=compress_level)
+
+
+def reproducible_timestamp():
+    """SOURCE_DATE_EPOCH if set, else the earliest time a zip can record."""
+    return int(os.environ.get("SOURCE_DATE_EPOCH", REPRODUCIBLE_EPOCH))
+
+
+# 1980-01-01T00:00:00Z, the earliest date a zip member can have.
+REPRODUCIBLE_EPOCH = 315532800
+
+
+def pin_properties(prs, timestamp):
+    """Set the core properties that vary between builds from `timestamp`.
+
+    Returns the matching zip member date, in UTC.
+    """
+    when = datetime.datetime.fromtimestamp(
+        max(timestamp, REPRODUCIBLE_EPOCH), datetime.timezone.utc
+    ).replace(tzinfo=None)
+    props = prs.core_properties
+    props.created = props.modified = when
+    props.last_modified_by = "generate_slides.py"
+    props.revision = 1
+    return when.timetuple()[:6]
+
+
+def save_reproducible(prs, file, timestamp=None, compress_level=None):
+    """Save `prs` so the same slides always give the same bytes.
+
+    The core properties' dates and every zip member's date come from
+    `timestamp` (default: reproducible_timestamp()), other varying
+    properties are pinned, members are sorted and their zip attributes fixed.
+    `compress_level` is as for save().
+    """
+    if timestamp is None:
+        timestamp = reproducible_timestamp()
+    _write_package(prs, file, pin_properties(prs, timestamp), compress_level=compress_level)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def slide_digest(spec):
+    """Hash of everything that decides how a slide comes out.
+
+    Covers the spec itself (builder, title, bullets, notes, ...), the content
+    of its media, the palette and the source of the builder's drawing function.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps(spec, sort_keys=True).encode())
+    if spec.get("media"):
+        for path in media_item(spec["media"]).values():
+            if path:
+                with open(path, "rb") as f:
+                    h.update(hashlib.sha256(f.read()).digest())
+    h.update(" ".join(str(c) for c in (BLACK, WHITE, GREEN, GRAY, DARK_GRAY)).encode())
+    h.update(inspect.getsource(PROTOTYPE_DRAWERS[spec["builder"]]).encode())
+    return h.hexdigest()
+
+
+def _patch_slides(output, specs, autofit=False, styled=False):
+    """Swap the slides at the keys of `specs` in `output` for freshly built ones.
+
+    Only the slide and notes-slide XML parts are replaced, so this returns
+    False, leaving `output` untouched, when a slide gains or loses notes or
+    relationships and the package structure would have to change, or, in a
+    styled deck, when a slide moves to another layout.
+    """
+    scratch = build_presentation(list(specs.values()), autofit=autofit, styled=styled)
+    replacements = {}
+    with zipfile.ZipFile(output) as zf:
+        partnames = opc.slide_partnames(zf)
+        for index, slide in zip(specs, scratch.slides):
+            partname = partnames[index]
+            old_rels = dict(opc.part_rels(zf, partname).values())
+            new_reltypes = {rel.reltype for rel in slide.part.rels.values()}
+            if set(old_rels) != new_reltypes or not new_reltypes <= {
+                opc.RT_SLIDE_LAYOUT,
+                opc.RT_NOTES_SLIDE,
+            }:
+                return False
+            # Styled layouts are numbered alike in every build; blank is always the same.
+            if old_rels[opc.RT_SLIDE_LAYOUT] != slide.slide_layout.part.partname.lstrip("/"):
+                return False
+            replacements[partname] = slide.part.blob
+            if opc.RT_NOTES_SLIDE in old_rels:
+                replacements[old_rels[opc.RT_NOTES_SLIDE]] = slide.notes_slide.part.blob
+    opc.rewrite_package(output, replacements)
+    return True
+
+
+def build_incremental(
+    slides, output, reproducible=False, compress_level=None, autofit=False, styled=False
+):
+    """Rebuild only the slides of `output` whose digest changed since last time.
+
+    Digests are kept next to the deck in ``<output>.hashes.json``. Without a
+    usable sidecar, when slides were added or removed, or when the last
+    build was made with a different `reproducible`, `autofit` or `styled`,
+    the deck is built in full. Patching keeps the other zip members' dates,
+    so a reproducible deck stays reproducible.
+    """
+    start = time.perf_counter()
+    sidecar = output + ".hashes.json"
+    digests = [slide_digest(spec) for spec in slides]
+    options = {"reproducible": reproducible, "autofit": autofit, "styled": styled}
+    try:
+        with open(sidecar, encoding="utf-8") as f:
+            state = json.load(f)
+        same = all(state.get(name, False) == value for name, value in options.items())
+        previous = state["slides"] if same else None
+    except (OSError, ValueError, KeyError):
+        previous = None
+
+    changed = None
+    if previous is not None and len(previous) == len(digests) and os.path.exists(output):
+        changed = [i for i, (old, new) in enumerate(zip(previous, digests)) if old != new]
+        patch = {i: slides[i] for i in changed}
+        if changed and not _patch_slides(output, patch, autofit, styled):
+            changed = None
+
+    if changed is None:
+        prs = build_presentation(slides, autofit=autofit, styled=styled)
+        if reproducible:
+            save_reproducible(prs, output, compress_level=compress_level)
+        else:
+            save(prs, output, compress_level)
+        summary = f"rebuilt all {len(slides)} slides"
+    else:
+        summary = f"rebuilt {len(changed)} of {len(slides)} slides"
+
+    with open(sidecar, "w", encoding="utf-8") as f:
+        json.dump({"slides": digests, **options}, f, indent=1)
+    print(f"Saved {output}: {summary} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+# First guess at a slide's compressed size: SPLIT_RATIO times its spec's
+# JSON plus SLIDE_XML_BYTES of markup, before its media. build_split()
+# corrects the ratio from every part it writes.
+SLIDE_XML_BYTES = 2500
+SPLIT_RATIO = 0.5
+
+
+def _media_paths(spec):
+    # The files a slide's media adds to the package, as add_media() stores them.
+    if not spec.get("media"):
+        return []
+    item = media_item(spec["media"])
+    width, height = _media_pixels()
+    paths = [item["poster"] and media.prepare_image(item["poster"], width, height)]
+    if media.is_video(item["path"]):
+        paths.append(item["path"])
+    else:
+        paths.append(media.prepare_image(item["path"], width, height))
+    return [path for path in paths if path]
+
+
+def _slide_cost(spec, seen):
+    # (markup bytes, media bytes) of a slide; media already in `seen` is free.
+    markup = SLIDE_XML_BYTES + len(json.dumps(spec).encode())
+    media_bytes = 0
+    for path in _media_paths(spec):
+        if path not in seen:
+            seen.add(path)
+            media_bytes += os.path.getsize(path)
+    return markup, media_bytes
+
+
+def _part_end(slides, start, max_slides, max_bytes, base, ratio):
+    # Index after the last slide of the part starting at `start`: as many
+    # slides as fit the caps, then back to a section slide in the second
+    # half of the part if there is one, so that section starts the next part.
+    seen = set()
+    size = base
+    end = start
+    while end < len(slides):
+        if max_slides and end - start >= max_slides:
+            break
+        markup, media_bytes = _slide_cost(slides[end], seen)
+        size += markup * ratio + media_bytes
+        if max_bytes and size > max_bytes and end > start:
+            break
+        end += 1
+    if end < len(slides):
+        for index in range(end, start + (end - start) // 2, -1):
+            if slides[index]["builder"] == "section":
+                return index
+    return end
+
+
+def split_name(output, number):
+    """Path of part `number` (from 1) of a split `output`: talk.pptx -> talk-001.pptx."""
+    stem, ext = os.path.splitext(output)
+    return f"{stem}-{number:03d}{ext}"
+
+
+def build_split(
+    slides,
+    output,
+    max_slides=None,
+    max_bytes=None,
+    autofit=False,
+    styled=False,
+    timestamp=None,
+    compress_level=None,
+):
+    """Build the slides as a series of decks capped at `max_slides` slides or `max_bytes`.
+
+    Parts go to split_name(output, 1), split_name(output, 2), ... and are
+    split before a section slide where one is close enough to the cap. Sizes
+    are estimated ahead of building; a part that comes out over `max_bytes`
+    is planned again with the corrected estimate, unless it is one slide.
+    Each part is written with save_streaming(), which gets `timestamp` and
+    `compress_level`, and dropped before the next is built, so memory is
+    bounded by the part, not the deck. Leftover parts from an earlier,
+    longer split are removed. Returns ``(path, slides,
+    bytes)`` per part.
+    """
+    media.prepare_images(media_jobs(slides))
+    empty = io.BytesIO()
+    new_presentation(styled).save(empty)
+    base = len(empty.getvalue())
+    ratio = SPLIT_RATIO
+
+    parts = []
+    start = 0
+    while start < len(slides):
+        end = _part_end(slides, start, max_slides, max_bytes, base, ratio)
+        path = split_name(output, len(parts) + 1)
+        part_slides = slides[start:end]
+        prs = build_presentation(part_slides, autofit=autofit, styled=styled)
+        save_streaming(prs, path, timestamp, compress_level)
+        del prs
+        size = os.path.getsize(path)
+
+        seen = set()
+        costs = [_slide_cost(spec, seen) for spec in part_slides]
+        markup = sum(cost[0] for cost in costs)
+        ratio = max((size - base - sum(cost[1] for cost in costs)) / markup, 0.01)
+        if max_bytes and size > max_bytes and end - start > 1:
+            continue
+        parts.append((path, end - start, size))
+        start = end
+
+    number = len(parts) + 1
+    while os.path.exists(split_name(output, number)):
+        os.remove(split_name(output, number))
+        number += 1
+    return parts
@@ -0,0 +1,196 @@
+"""Estimate how text wraps in a textbox from cached glyph widths.
+
+PowerPoint lays text out when a deck is opened, so python-pptx can't say
+whether a slide overflows. This measures it instead: advance widths come
+from the theme font (Calibri, or the metric-compatible Carlito) through
+Pillow, are cached per character as a fraction of the em and scaled to each
+font size, and lines are broken greedily at spaces the way PowerPoint does.
+"""
+
+import os
+from functools import lru_cache
+
+from PIL import ImageFont
+
+# Metric-compatible files for the template's theme font, in order of preference.
+FONT_FILES = {
+    False: ("calibri.ttf", "Calibri.ttf", "Carlito-Regular.ttf"),
+    True: ("calibrib.ttf", "Calibri Bold.ttf", "Carlito-Bold.ttf"),
+}
+FONT_DIRS = (
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    os.path.expanduser("~/Library/Fonts"),
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+)
+
+# Size glyphs are measured at; widths are stored as fractions of this.
+REFERENCE_SIZE = 1000
+
+# Default textbox insets (0.1" left/right, 0.05" top/bottom) and the line
+# height PowerPoint uses for Calibri at single spacing, relative to the size.
+INSET_X = 7.2
+INSET_Y = 3.6
+LINE_HEIGHT = 1.22
+
+
+@lru_cache(maxsize=None)
+def _font_paths():
+    names = {name.lower() for files in FONT_FILES.values() for name in files}
+    found = {}
+    for directory in FONT_DIRS:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower() in names:
+                    found.setdefault(name.lower(), os.path.join(root, name))
+    return found
+
+
+class FontMetrics:
+    """Advance widths of one font face, cached per character."""
+
+    def __init__(self, bold=False):
+        paths = _font_paths()
+        path = next((paths[n.lower()] for n in FONT_FILES[bold] if n.lower() in paths), None)
+        self.path = path  # None for Pillow's default font
+        if path:
+            self.font = ImageFont.truetype(path, REFERENCE_SIZE)
+            self.name = os.path.basename(path)
+            self.approximate = False
+        else:
+            # Pillow's bundled sans-serif: wider than Calibri, so estimates err
+            # on the side of reporting overflow.
+            self.font = ImageFont.load_default(REFERENCE_SIZE)
+            self.name = "Pillow default font"
+            self.approximate = True
+        self._em = {}
+
+    def em_width(self, text):
+        """Width of `text` in ems (kerning ignored)."""
+        em = self._em
+        total = 0.0
+        for ch in text:
+            width = em.get(ch)
+            if width is None:
+                width = em[ch] = self.font.getlength(ch) / REFERENCE_SIZE
+            total += width
+        return total
+
+    def line_count(self, text, size, width):
+        """Lines `text` takes when wrapped to `width` points at `size` points."""
+        space = self.em_width(" ") * size
+        lines = 0
+        for segment in text.split("\n"):
+            lines += 1
+            x = 0.0
+            for word in segment.split(" "):
+                w = self.em_width(word) * size
+                if x and x + space + w > width:
+                    lines += 1
+                    x = 0.0
+                if w > width:
+                    # PowerPoint breaks a word wider than the box mid-word.
+                    lines += int(w // width)
+                    w %= width
+                x += (space if x else 0.0) + w
+        return lines
+
+    def wrap(self, text, size, width):
+        """The lines `text` breaks into, by the same rules as line_count()."""
+        space = self.em_width(" ") * size
+        lines = []
+        for segment in text.split("\n"):
+            line = []
+            x = 0.0
+            for word in segment.split(" "):
+                w = self.em_width(word) * size
+                if x and x + space + w > width:
+                    lines.append(" ".join(line))
+                    line = []
+                    x = 0.0
+                while w > width:
+                    cut = 1
+                    while cut < len(word) - 1 and self.em_width(word[: cut + 1]) * size <= width:
+                        cut += 1
+                    lines.append(" ".join(line + [word[:cut]]))
+                    line = []
+                    word = word[cut:]
+                    w = self.em_width(word) * size
+                line.append(word)
+                x += (space if x else 0.0) + w
+            lines.append(" ".join(line))
+        return lines
+
+
+@lru_cache(maxsize=None)
+def metrics(bold=False):
+    return FontMetrics(bold)
+
+
+def text_height(box, paragraphs, size):
+    """Height in points the paragraphs take in `box` when set at `size`.
+
+    `box` is a mapping with the textbox ``width`` in points, the design
+    ``size`` and ``bold`` of its text and the ``space_before`` of every
+    paragraph after the first, as returned by slides.text_boxes().
+    """
+    face = metrics(box["bold"])
+    width = box["width"] - 2 * INSET_X
+    lines = sum(face.line_count(p, size, width) for p in paragraphs or [""])
+    gaps = max(len(paragraphs) - 1, 0) * box["space_before"]
+    return lines * size * LINE_HEIGHT + gaps + 2 * INSET_Y
+
+
+def fit_size(box, paragraphs, available, min_size=10):
+    """Largest size, in half points, at which the paragraphs fit `available`.
+
+    Returns the design size when it already fits and `min_size` when nothing
+    does. Binary search: text height only grows with the size.
+    """
+    if text_height(box, paragraphs, box["size"]) <= available:
+        return box["size"]
+    lo, hi = int(min_size * 2), int(box["size"] * 2) - 1
+    best = lo
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if text_height(box, paragraphs, mid / 2) <= available:
+            best = mid
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return best / 2
+
+
+def measure(boxes, texts, slide_height):
+    """Measure one slide; return a result per textbox that has text.
+
+    Each box may grow down to the top of the next box below it, or to the
+    bottom of the slide.
+    """
+    results = []
+    for i, (box, paragraphs) in enumerate(zip(boxes, texts)):
+        below = [b["top"] for b in boxes[i + 1 : len(texts)] if b["top"] > box["top"]]
+        available = min(below or [slide_height]) - box["top"]
+        height = text_height(box, paragraphs, box["size"])
+        results.append(
+            {
+                "height": height,
+                "available": available,
+                "overflow": height > available,
+                "fit_size": fit_size(box, paragraphs, available) if height > available else None,
+            }
+        )
+    return results
+
+
+def font_note():
+    """Which fonts the measurements came from, for reports."""
+    faces = [metrics(False), metrics(True)]
+    note = ", ".join(face.name for face in faces)
+    if any(face.approximate for face in faces):
+        note += " (Calibri/Carlito not found, widths are approximate)"
+    return note
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""Render a contact sheet of slide thumbnails from finished decks, without an office suite.
+
+    uv run thumbnails.py talk.pptx                  # -> talk.contact.png
+    uv run thumbnails.py decks/*.pptx --width 240 --columns 8
+
+Covers what the slide builders produce: solid backgrounds, textboxes with
+wrapped, coloured, aligned text and pictures, including video posters. Text
+takes its formatting from the slide, or from the layout placeholder it
+inherits from in styled decks, and is wrapped by text_fit the way the
+overflow check and the HTML preview wrap it. Slides are read straight from
+the zip and drawn in a process pool, each worker keeping its open decks,
+parsed layouts and sized fonts; the main process only tiles the results.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from lxml import etree
+from PIL import Image, ImageDraw, ImageFont
+
+import opc
+import preview
+import text_fit
+
+NS_R_ID = f"{{{opc.NS_R}}}embed"
+RT_SLIDE_LAYOUT = opc.RT_SLIDE_LAYOUT
+RT_SLIDE_MASTER = opc.NS_R + "/slideMaster"
+
+# Where nothing says otherwise, as in the default template.
+DEFAULT_STYLE = {"size": 18.0, "bold": False, "color": "000000", "align": "l", "space_before": 0}
+
+SHEET_BACKGROUND = (32, 32, 32)
+LABEL_COLOR = (200, 200, 200)
+GAP = 12
+
+BACKGROUND_COLOR = "/".join(
+    [f"{{{opc.NS_P}}}{tag}" for tag in ("cSld", "bg", "bgPr")]
+    + [f"{{{opc.NS_A}}}{tag}" for tag in ("solidFill", "srgbClr")]
+)
+
+
+def _a(tag):
+    return f"{{{opc.NS_A}}}{tag}"
+
+
+def _p(tag):
+    return f"{{{opc.NS_P}}}{tag}"
+
+
+@lru_cache(maxsize=None)
+def _zip(path, mtime_ns):
+    # One open zip per deck per worker process.
+    return zipfile.ZipFile(path)
+
+
+@lru_cache(maxsize=None)
+def _part(path, mtime_ns, partname):
+    # Layouts and masters are parsed once per worker and shared by slides.
+    return etree.fromstring(_zip(path, mtime_ns).read(partname))
+
+
+@lru_cache(maxsize=None)
+def font(bold, pixels):
+    """The theme font at `pixels` high, as text_fit measures it."""
+    path = text_fit.metrics(bold).path
+    return ImageFont.truetype(path, pixels) if path else ImageFont.load_default(pixels)
+
+
+def slide_size(path):
+    """The slide width and height of a deck, in points."""
+    with zipfile.ZipFile(path) as zf:
+        sldSz = etree.fromstring(zf.read("ppt/presentation.xml")).find(_p("sldSz"))
+    return int(sldSz.get("cx")) / 12700, int(sldSz.get("cy")) / 12700
+
+
+def _target(zf, partname, reltype):
+    for rel_type, target in opc.part_rels(zf, partname).values():
+        if rel_type == reltype:
+            return target
+    return None
+
+
+def _background(roots):
+    for root in roots:
+        if root is None:
+            continue
+        color = root.find(BACKGROUND_COLOR)
+        if color is not None:
+            return color.get("val")
+    return "FFFFFF"
+
+
+def _xfrm(element, inherited=None):
+    # Offset and size each fall back to the layout placeholder's: a styled
+    # deck's slide may override just the width of its body.
+    found = {}
+    for source in (element, inherited):
+        if source is None:
+            continue
+        for tag, names in (("off", ("x", "y")), ("ext", ("cx", "cy"))):
+            node = source.find(f"{_p('spPr')}/{_a('xfrm')}/{_a(tag)}")
+            if node is not None and tag not in found:
+                found[tag] = [int(node.get(name)) / 12700 for name in names]
+    if len(found) < 2:
+        return None
+    return (*found["off"], *found["ext"])
+
+
+def _placeholder_key(sp):
+    ph = sp.find(f"{_p('nvSpPr')}/{_p('nvPr')}/{_p('ph')}")
+    if ph is None:
+        return None
+    return ph.get("type", "body"), ph.get("idx", "0")
+
+
+def _apply(style, pPr):
+    # Overlay the paragraph or level style in `pPr` (a:pPr or a:lvl1pPr).
+    if pPr is None:
+        return style
+    style = dict(style)
+    style["align"] = pPr.get("algn", style["align"])
+    spcPts = pPr.find(f"{_a('spcBef')}/{_a('spcPts')}")
+    if spcPts is not None:
+        style["space_before"] = int(spcPts.get("val")) / 100
+    return _apply_run(style, pPr.find(_a("defRPr")))
+
+
+def _apply_run(style, rPr):
+    if rPr is None:
+        return style
+    style = dict(style)
+    if rPr.get("sz"):
+        style["size"] = int(rPr.get("sz")) / 100
+    if rPr.get("b"):
+        style["bold"] = rPr.get("b") in ("1", "true")
+    color = rPr.find(f"{_a('solidFill')}/{_a('srgbClr')}")
+    if color is not None:
+        style["color"] = color.get("val")
+    return style
+
+
+def read_slide(path, partname):
+    """Background, textboxes and pictures of one slide, in points.
+
+    Returns ``(background, boxes, pictures)``: each box is ``(left, top,
+    width, paragraphs)`` with ``(text, style)`` paragraphs, each picture
+    ``(left, top, width, height, blob)``.
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    zf = _zip(path, mtime_ns)
+    slide = etree.fromstring(zf.read(partname))
+    layout_name = _target(zf, partname, RT_SLIDE_LAYOUT)
+    layout = _part(path, mtime_ns, layout_name) if layout_name else None
+    master_name = layout_name and _target(zf, layout_name, RT_SLIDE_MASTER)
+    master = _part(path, mtime_ns, master_name) if master_name else None
+
+    placeholders = {}
+    if layout is not None:
+        for sp in layout.find(f"{_p('cSld')}/{_p('spTree')}").iter(_p("sp")):
+            key = _placeholder_key(sp)
+            if key:
+                placeholders[key] = sp
+
+    boxes = []
+    pictures = []
+    rels = None
+    for element in slide.find(f"{_p('cSld')}/{_p('spTree')}"):
+        if element.tag == _p("pic"):
+            blip = element.find(f".//{_a('blip')}")
+            box = _xfrm(element)
+            if blip is None or box is None:
+                continue
+            if rels is None:
+                rels = opc.part_rels(zf, partname)
+            target = rels.get(blip.get(NS_R_ID), (None, None))[1]
+            if target:
+                pictures.append((*box, zf.read(target)))
+            continue
+        if element.tag != _p("sp") or element.find(_p("txBody")) is None:
+            continue
+        inherited = placeholders.get(_placeholder_key(element))
+        box = _xfrm(element, inherited)
+        if box is None:
+            continue
+        style = DEFAULT_STYLE
+        level = f"{_p('txBody')}/{_a('lstStyle')}/{_a('lvl1pPr')}"
+        if inherited is not None:
+            style = _apply(style, inherited.find(level))
+        style = _apply(style, element.find(level))
+        paragraphs = []
+        for p in element.find(_p("txBody")).iter(_a("p")):
+            p_style = _apply(style, p.find(_a("pPr")))
+            p_style = _apply_run(p_style, p.find(f"{_a('r')}/{_a('rPr')}"))
+            paragraphs.append((opc.paragraph_text(p), p_style))
+        boxes.append((box[0], box[1], box[2], paragraphs))
+    return _background([slide, layout, master]), boxes, pictures
+
+
+def render_slide(path, partname, width, slide_width, slide_height):
+    """Draw one slide `width` pixels wide; returns the image as PNG bytes."""
+    background, boxes, pictures = read_slide(path, partname)
+    scale = width / slide_width
+    image = Image.new("RGB", (width, round(slide_height * scale)), "#" + background)
+    for left, top, box_width, box_height, blob in pictures:
+        with Image.open(io.BytesIO(blob)) as picture:
+            size = (max(round(box_width * scale), 1), max(round(box_height * scale), 1))
+            picture = picture.convert("RGBA").resize(size, Image.BILINEAR)
+            image.paste(picture, (round(left * scale), round(top * scale)), picture)
+
+    draw = ImageDraw.Draw(image)
+    for left, top, box_width, paragraphs in boxes:
+        wrap_width = box_width - 2 * text_fit.INSET_X
+        y = top + text_fit.INSET_Y
+        for i, (text, style) in enumerate(paragraphs):
+            size = style["size"]
+            if i:
+                y += style["space_before"]
+            anchor = preview.ANCHORS.get(style["align"], "start")
+            x = {
+                "start": left + text_fit.INSET_X,
+                "middle": left + box_width / 2,
+                "end": left + box_width - text_fit.INSET_X,
+            }[anchor]
+            face = font(style["bold"], max(round(size * scale), 1))
+            for line in text_fit.metrics(style["bold"]).wrap(text, size, wrap_width):
+                if line:
+                    draw.text(
+                        (x * scale, (y + size * preview.BASELINE) * scale),
+                        line,
+                        fill="#" + style["color"],
+                        font=face,
+                        anchor={"start": "ls", "middle": "ms", "end": "rs"}[anchor],
+                    )
+                y += size * text_fit.LINE_HEIGHT
+    out = io.BytesIO()
+    image.save(out, "PNG", compress_level=1)
+    return out.getvalue()
+
+
+def _render(task):
+    # Runs in a worker process.
+    return render_slide(*task)
+
+
+def contact_sheet(thumbnails, columns):
+    """Tile the thumbnails, numbered from 1, `columns` to a row."""
+    width, height = thumbnails[0].size
+    label = font(False, max(height // 12, 10))
+    label_height = label.size + GAP // 2
+    rows = -(-len(thumbnails) // columns)
+    sheet = Image.new(
+        "RGB",
+        (
+            GAP + min(columns, len(thumbnails)) * (width + GAP),
+            GAP + rows * (height + label_height + GAP),
+        ),
+        SHEET_BACKGROUND,
+    )
+    draw = ImageDraw.Draw(sheet)
+    for index, thumbnail in enumerate(thumbnails):
+        row, column = divmod(index, columns)
+        x = GAP + column * (width + GAP)
+        y = GAP + row * (height + label_height + GAP)
+        sheet.paste(thumbnail, (x, y))
+        draw.text((x, y + height + GAP // 4), str(index + 1), fill=LABEL_COLOR, font=label)
+    return sheet
+
+
+def render_decks(decks, width=320, columns=6, workers=None, outputs=None):
+    """Write a contact sheet per deck; returns ``(deck, output, slides)`` for each.
+
+    Slides of all decks share one process pool. `outputs` defaults to
+    ``<deck>.contact.png`` next to each deck.
+    """
+    tasks = []
+    counts = []
+    for deck in decks:
+        with zipfile.ZipFile(deck) as zf:
+            partnames = opc.slide_partnames(zf)
+        slide_width, slide_height = slide_size(deck)
+        tasks += [(deck, partname, width, slide_width, slide_height) for partname in partnames]
+        counts.append(len(partnames))
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool:
+        rendered = iter(
+            pool.map(_render, tasks, chunksize=max(len(tasks) // (workers * 4), 1))
+        )
+        results = []
+        for i, (deck, count) in enumerate(zip(decks, counts)):
+            output = outputs[i] if outputs else os.path.splitext(deck)[0] + ".contact.png"
+            thumbnails = [Image.open(io.BytesIO(next(rendered))) for _ in range(count)]
+            if thumbnails:
+                contact_sheet(thumbnails, columns).save(output)
+            results.append((deck, output, count))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("decks", nargs="+", help=".pptx files")
+    parser.add_argument("-o", "--output", help="contact sheet path, for a single deck")
+    parser.add_argument("--width", type=int, default=320, help="thumbnail width in pixels")
+    parser.add_argument("--columns", type=int, default=6)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    if args.output and len(args.decks) > 1:
+        parser.error("-o only works with a single deck")
+
+    start = time.perf_counter()
+    try:
+        results = render_decks(
+            args.decks,
+            args.width,
+            args.columns,
+            args.workers,
+            [args.output] if args.output else None,
+        )
+    except (OSError, KeyError, zipfile.BadZipFile) as exc:
+        sys.exit(f"{type(exc).__name__}: {exc}")
+    for deck, output, count in results:
+        print(f"Wrote {output} with {count} slides from {deck}")
+    print(f"Rendered {sum(r[2] for r in results)} slides in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
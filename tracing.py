@@ -0,0 +1,120 @@
+"""Per-stage timing and memory tracing for deck builds.
+
+A StageTracer records one event per stage (import, template load, each
+builder call, notes, save) with its duration and the memory tracemalloc saw
+it allocate. The events are written as a Chrome trace (load it in
+chrome://tracing or https://ui.perfetto.dev) and summarised per stage as JSON.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageTracer:
+    """Record stages as Chrome "complete" events.
+
+    Creating a tracer starts tracemalloc, which makes everything traced
+    noticeably slower; compare stages with each other rather than with
+    untraced runs. Stages must not be nested.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._origin = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, category):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            after, peak = tracemalloc.get_traced_memory()
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "allocated": after - before,
+                    "peak": peak - before,
+                    "traced": after,
+                }
+            )
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        trace = []
+        for event in self.events:
+            trace.append(
+                {
+                    "name": event["name"],
+                    "cat": event["cat"],
+                    "ph": "X",
+                    "ts": event["ts"],
+                    "dur": event["dur"],
+                    "pid": pid,
+                    "tid": 1,
+                    "args": {"allocated": event["allocated"], "peak": event["peak"]},
+                }
+            )
+            trace.append(
+                {
+                    "name": "traced memory",
+                    "ph": "C",
+                    "ts": event["ts"] + event["dur"],
+                    "pid": pid,
+                    "args": {"bytes": event["traced"]},
+                }
+            )
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def summary(self):
+        """Totals per category and per stage name, slowest first."""
+        stages = {}
+        for event in self.events:
+            key = (event["cat"], event["name"])
+            stage = stages.setdefault(
+                key,
+                {
+                    "category": event["cat"],
+                    "name": event["name"],
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "allocated_bytes": 0,
+                    "max_peak_bytes": 0,
+                },
+            )
+            ms = event["dur"] / 1000
+            stage["calls"] += 1
+            stage["total_ms"] += ms
+            stage["max_ms"] = max(stage["max_ms"], ms)
+            stage["allocated_bytes"] += event["allocated"]
+            stage["max_peak_bytes"] = max(stage["max_peak_bytes"], event["peak"])
+
+        categories = {}
+        for stage in stages.values():
+            total = categories.setdefault(stage["category"], {"calls": 0, "total_ms": 0.0})
+            total["calls"] += stage["calls"]
+            total["total_ms"] += stage["total_ms"]
+
+        return {
+            "wall_ms": sum(event["dur"] for event in self.events) / 1000,
+            "categories": categories,
+            "stages": sorted(stages.values(), key=lambda s: s["total_ms"], reverse=True),
+        }
+
+    def write(self, prefix):
+        """Write ``<prefix>.trace.json`` and ``<prefix>.profile.json``."""
+        with open(prefix + ".trace.json", "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        with open(prefix + ".profile.json", "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)